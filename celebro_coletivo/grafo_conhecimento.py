@@ -17,13 +17,15 @@ class GrafoDeConhecimento:
         Registra um novo nó no grafo.
         """
         if id_no not in self.nos:
-            self.nos[id_no] = self.manager.dict({
+            # O nó é montado localmente e gravado com uma única atribuição:
+            # valores simples (dict comum) evitam um proxy do Manager por campo.
+            self.nos[id_no] = {
                 'tipo': tipo_no,
                 'estado': 'INICIALIZADO',
                 'metadados': metadados or {},
-                'metricas': self.manager.dict(),
+                'metricas': {},
                 'saude': 100
-            })
+            }
             log('DEBUG', self.fonte, f"Nó '{id_no}' do tipo '{tipo_no}' registrado no grafo.")
         else:
             log('WARN', self.fonte, f"Tentativa de registrar um nó já existente: '{id_no}'.")
@@ -32,19 +34,14 @@ class GrafoDeConhecimento:
         """
         Atualiza o estado ou as métricas de um nó existente.
         """
-        if id_no in self.nos:
-            # Para atualizar um dict gerenciado, é preciso obter o proxy e modificá-lo
-            no_atual = self.nos[id_no]
+        # Uma leitura e uma escrita no Manager, independente da quantidade de campos
+        no_atual = self.nos.get(id_no)
+        if no_atual is not None:
             for chave, valor in novo_estado.items():
                 if chave == 'metricas' and isinstance(valor, dict):
-                    # Atualiza o sub-dicionário de métricas
-                    metricas_atuais = no_atual['metricas']
-                    metricas_atuais.update(valor)
-                    no_atual['metricas'] = metricas_atuais
+                    no_atual['metricas'].update(valor)
                 else:
                     no_atual[chave] = valor
-            
-            # É preciso reatribuir para garantir a sincronização
             self.nos[id_no] = no_atual
         else:
             log('ERROR', self.fonte, f"Tentativa de atualizar um nó inexistente: '{id_no}'.")
\ No newline at end of file
@@ -38,15 +38,37 @@ Referência Técnica:
 
 
 from multiprocessing import Process
-from queue import Queue
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
 import time
 from typing import Dict, List, Any
-from modulos.logger import log
+from modulos.logger import log, log_desativado
 from datetime import datetime
 
 # Importa a biblioteca do driver diretamente aqui
 from pycomm3 import LogixDriver
 
+# Valores textuais aceitos como verdadeiro em tags BOOL (1/0, 'true'/'false', True/False)
+_VALORES_VERDADEIROS = frozenset(("1", "true", "sim", "yes"))
+
+
+def _para_bool(valor):
+    if isinstance(valor, str):
+        return valor.strip().lower() in _VALORES_VERDADEIROS
+    return bool(valor)
+
+
+# Conversores por tipo_dado, resolvidos uma vez por tag no __init__.
+# Tipos não listados são escritos sem conversão; outros tipos podem ser expandidos.
+_CONVERSORES = {
+    "int": int,
+    "float": float,
+    "real": float,
+    "double": float,
+    "bool": _para_bool,
+    "string": str,
+}
+
 class controllogixDriverProcess(Process):
     """
     Processo autônomo que gerencia a comunicação com um único CLP.
@@ -69,23 +91,73 @@ class controllogixDriverProcess(Process):
         self.timeout_s = config.get('timeout', 5000) / 1000.0
         self.retry_count = config.get('retry_count', 3)
         self.log_enabled = config.get('log_enabled', True)
+        # Logger resolvido uma vez: com log desabilitado, as chamadas viram no-op sem checar a flag
+        self._log = log if self.log_enabled else log_desativado
+        # Upload da lista de tags na abertura da sessão (o pycomm3 precisa das definições para ler por nome)
+        self.init_tags = config.get('init_tags', True)
+        self.init_program_tags = config.get('init_program_tags', True)
+        self.keepalive_s = config.get('keepalive_interval', 60000) / 1000.0
+
+        # Sessão EtherNet/IP reutilizada entre scans; só é reaberta após erro de comunicação
+        self._plc = None
+        self._ultima_comunicacao = 0.0
+        # Sessão dedicada às escritas, executadas em paralelo com as leituras do scan
+        self.dedicated_write_session = config.get('dedicated_write_session', True)
+        self._plc_escrita = None
+        self._ultima_comunicacao_escrita = 0.0
+
+        # Índices das tags calculados uma única vez (evitam buscas lineares a cada scan)
+        # Tags em scan sem endereço são descartadas aqui: ocupariam um slot da requisição CIP
+        # e o pycomm3 pode derrubar a sessão ao receber None como nome de tag
+        tags_em_scan = [t for t in tags_config if t.get('scan_enabled', True)]
+        self._tags_ativas = [t for t in tags_em_scan if t.get('endereco')]
+        self._tags_sem_endereco = [t['id'] for t in tags_em_scan if not t.get('endereco')]
+        self._tags_by_id = {t['id']: t for t in tags_config}
+        self._tags_para_ler = [t.get('endereco') for t in self._tags_ativas]
+        self._ids_ativos = {t['id'] for t in self._tags_ativas}
+        self._conversores = {t['id']: _CONVERSORES.get(t.get('tipo_dado')) for t in tags_config}
+        self._tag_status_templates = {t['id']: self._montar_template_status(t['id'], t) for t in tags_config}
+
+        # Payload de desconexão pré-montado (usado por _mark_all_tags_bad)
+        self._all_bad_entry = {"valor": None, "qualidade": "ruim", "log": None}
+        self._all_bad_template = dict.fromkeys(self._tags_by_id, self._all_bad_entry)
+
+        # Escritas aguardando confirmação pela leitura do próximo scan: tag_id -> (endereco, tipo, valor)
+        self._pending_verifications: Dict[str, tuple] = {}
+
+        # Leituras divididas em grupos pequenos: requisições CIP múltiplas grandes degradam o scan
+        self.read_chunk_size = max(1, int(config.get('read_chunk_size', 20)))
+        self._read_chunks = [
+            self._tags_para_ler[i:i + self.read_chunk_size]
+            for i in range(0, len(self._tags_para_ler), self.read_chunk_size)
+        ]
 
+        # Estado local das tags, acumulado durante o scan e publicado uma única vez por ciclo
+        self._local_tags: Dict[str, Dict[str, Any]] = {}
+        # Último (valor, qualidade, log) publicado por tag, para detectar mudanças
+        self._last_values: Dict[str, tuple] = {}
+        self._tags_alteradas = False
+        # Cópia local do registro deste driver no dicionário compartilhado. O processo é o único
+        # escritor do próprio registro, então lê da cópia e só escreve no compartilhado.
+        self._local_mirror: Dict[str, Any] = {}
 
     def run(self):
         self.running = True
-        if self.log_enabled:
-            log('INFO', self.source_name, f'[{self.driver_config["tipo"]}] Processo iniciado.')
+        # Estado inicial publicado pelo sistema (fase, modo de operação, restrições...)
+        self._local_mirror = dict(self.shared_data.get(self.driver_id, {}))
+        self._log('INFO', self.source_name, f'[{self.driver_config["tipo"]}] Processo iniciado.')
         
         if not self.ip:
             detalhe_erro = "Configuração inválida: Endereço IP não fornecido."
-            if self.log_enabled: log('ERROR', self.source_name, detalhe_erro)
+            self._log('ERROR', self.source_name, detalhe_erro)
             self._update_shared_status("desconectado", detalhe_erro)
             self._mark_all_tags_bad("Desconectado")
             return
 
-        tags_para_ler = [
-            tag.get('endereco') for tag in self.tags_config if tag.get('scan_enabled', True)
-        ]
+        if self._tags_sem_endereco:
+            self._log('WARN', self.source_name, f"Tags sem endereço removidas do scan: {self._tags_sem_endereco}")
+
+        tags_para_ler = self._tags_para_ler
 
         last_logged_status = None
         last_error_log_time = 0
@@ -98,25 +170,26 @@ class controllogixDriverProcess(Process):
             # --- Loop de Tentativas de Conexão ---
             while not conectado and tentativas_de_conexao < self.retry_count and self.running:
                 try:
-                    # O 'with' já gerencia a conexão, se falhar, levanta exceção
-                    with LogixDriver(self.ip, timeout=self.timeout_s) as plc:
-                        conectado = True # Se o 'with' foi bem-sucedido, estamos conectados
-
-                        if last_logged_status != 'conectado':
-                            if self.log_enabled:
-                                log('INFO', self.source_name, "Conexão estabelecida com sucesso.")
-                            self._update_shared_status("conectado", "Monitorando...")
-                            last_logged_status = 'conectado'
-                        
-                        self._communication_loop(plc, tags_para_ler) # Entra no loop de comunicação
+                    plc = self._conectar_plc()
+                    conectado = True
+
+                    if last_logged_status != 'conectado':
+                        self._log('INFO', self.source_name, "Conexão estabelecida com sucesso.")
+                        self._update_shared_status("conectado", "Monitorando...")
+                        last_logged_status = 'conectado'
+
+                    self._communication_loop(plc, tags_para_ler) # Entra no loop de comunicação
+                    # O loop só retorna em erro de comunicação ou parada: a sessão é encerrada
+                    self._fechar_plc()
 
                 except Exception as e:
+                    self._fechar_plc()
                     tentativas_de_conexao += 1
                     detalhe_erro = f"Falha ao conectar (tentativa {tentativas_de_conexao}/{self.retry_count}): {e}"
                     
                     now = time.time()
                     if last_logged_status != 'desconectado' or (now - last_error_log_time > log_interval_seconds):
-                        if self.log_enabled: log('ERROR', self.source_name, detalhe_erro)
+                        self._log('ERROR', self.source_name, detalhe_erro)
                         last_error_log_time = now
 
                     self._update_shared_status("desconectado", detalhe_erro)
@@ -129,103 +202,148 @@ class controllogixDriverProcess(Process):
 
             # Se saiu do loop de tentativas sem sucesso, faz uma pausa longa
             if self.running and not conectado:
-                if self.log_enabled:
-                    log('WARN', self.source_name, f"Máximo de {self.retry_count} tentativas de conexão atingido. Aguardando 10s.")
+                self._log('WARN', self.source_name, f"Máximo de {self.retry_count} tentativas de conexão atingido. Aguardando 10s.")
                 time.sleep(10)
 
-    def _convert_value_for_tag(self, valor, tipo_dado):
+    def _conectar_plc(self) -> LogixDriver:
         """
-        Converte o valor para o tipo correto conforme especificado em tipo_dado.
-        Suporta: int, float, real, double, bool, string. Outros tipos podem ser expandidos.
+        Abre a sessão com o CLP, reutilizando o mesmo LogixDriver entre reconexões.
+        Com `dedicated_write_session`, abre também a sessão usada pelas escritas.
         """
-        try:
-            if tipo_dado == "int":
-                return int(valor)
-            elif tipo_dado in ("float", "real", "double"):
-                return float(valor)
-            elif tipo_dado == "bool":
-                # Aceita 1/0, 'true'/'false', True/False
-                if isinstance(valor, str):
-                    return valor.strip().lower() in ("1", "true", "sim", "yes")
-                return bool(valor)
-            elif tipo_dado == "string":
-                return str(valor)
-            # Adicione outros tipos conforme necessário
-            return valor
-        except Exception as e:
-            if self.log_enabled:
-                log('ERROR', self.source_name, f"Falha na conversão do valor '{valor}' para tipo '{tipo_dado}': {e}")
-            return valor
-
-    def _process_write_queue(self, plc_client: LogixDriver):
-        """Verifica e processa comandos na fila de escrita."""
-        while not self.write_queue.empty():
-            tag_id, valor = self.write_queue.get_nowait()
-            tag_config = next((t for t in self.tags_config if t['id'] == tag_id), None)
+        if self._plc is None:
+            self._plc = self._novo_driver()
+        if not self._plc.connected:
+            self._plc.open()
+        self._ultima_comunicacao = time.monotonic()
+
+        if self.dedicated_write_session:
+            if self._plc_escrita is None:
+                self._plc_escrita = self._novo_driver()
+            if not self._plc_escrita.connected:
+                self._plc_escrita.open()
+            self._ultima_comunicacao_escrita = time.monotonic()
+        return self._plc
+
+    def _novo_driver(self) -> LogixDriver:
+        return LogixDriver(self.ip, timeout=self.timeout_s,
+                           init_tags=self.init_tags, init_program_tags=self.init_program_tags)
+
+    def _fechar_plc(self):
+        """Fecha as sessões atuais; a próxima tentativa de conexão reabre os mesmos drivers."""
+        for plc in (self._plc, self._plc_escrita):
+            if plc is not None:
+                try:
+                    plc.close()
+                except Exception:
+                    pass
+
+    def _process_write_queue(self, plc_client: LogixDriver) -> Dict[str, tuple]:
+        """
+        Drena a fila de escrita e envia todos os comandos válidos ao CLP
+        em uma única requisição CIP múltipla. A confirmação de cada escrita
+        é feita no próximo scan de leitura (`_verificar_escrita`).
+
+        Retorna as escritas a confirmar (tag_id -> (endereco, tipo, valor)); quem chama
+        as registra em `_pending_verifications`. Assim, uma escrita executada em paralelo
+        com a leitura não é conferida contra um valor lido antes dela.
+        """
+        verificacoes = {}
+        comandos = []  # (tag_id, endereco, tipo_dado, valor_convertido)
+        while True:
+            try:
+                tag_id, valor = self.write_queue.get_nowait()
+            except Empty:
+                break
+            tag_config = self._tags_by_id.get(tag_id)
             if not tag_config or not tag_config.get('escrita_permitida'):
-                if self.log_enabled:
-                    log('WARN', self.source_name, f"Escrita ignorada para tag '{tag_id}' (não encontrada ou sem permissão).")
+                self._log('WARN', self.source_name, f"Escrita ignorada para tag '{tag_id}' (não encontrada ou sem permissão).")
                 continue
             tag_endereco = tag_config.get('endereco')
+            if not tag_endereco:
+                self._log('WARN', self.source_name, f"Comando de escrita para tag desconhecida '{tag_id}' ignorado.")
+                continue
             tipo_dado = tag_config.get('tipo_dado', None)
-            valor_convertido = self._convert_value_for_tag(valor, tipo_dado)
-            if tag_endereco:
-                try:
-                    response = plc_client.write((tag_endereco, valor_convertido))
-                    erro_escrita = getattr(response, 'error', None)
-                    # Delay para garantir atualização do CLP
-                    time.sleep(0.1)
-                    valor_lido = None
-                    tipo_valor_lido = None
-                    try:
-                        resp_leitura = plc_client.read(tag_endereco)
-                        if resp_leitura.error is None:
-                            valor_lido = resp_leitura.value
-                            tipo_valor_lido = type(valor_lido).__name__
-                    except Exception as e:
-                        valor_lido = f"Erro leitura pós-escrita: {e}"
-                        tipo_valor_lido = None
-                    escrita_efetivada = (valor_lido == valor_convertido)
-                    if self.log_enabled:
-                        log('INFO', self.source_name,
-                            f"Escrita na tag '{tag_id}' (endereço: '{tag_endereco}'): valor_enviado='{valor_convertido}' (tipo: '{tipo_dado}'), erro='{erro_escrita}', valor_lido='{valor_lido}' (tipo_lido: '{tipo_valor_lido}'), sucesso={'SIM' if escrita_efetivada else 'NÃO'}")
-                    if erro_escrita:
-                        if self.log_enabled:
-                            log('ERROR', self.source_name, f"Erro na escrita de '{tag_endereco}': {erro_escrita}")
-                except Exception as e:
-                    if self.log_enabled:
-                        log('ERROR', self.source_name, f"Exceção na escrita de '{tag_endereco}': {e}")
+            conversor = self._conversores[tag_id]
+            try:
+                valor_convertido = conversor(valor) if conversor else valor
+            except Exception as e:
+                self._log('ERROR', self.source_name, f"Falha na conversão do valor '{valor}' para tipo '{tipo_dado}': {e}")
+                valor_convertido = valor
+            comandos.append((tag_id, tag_endereco, tipo_dado, valor_convertido))
+
+        if not comandos:
+            return verificacoes
+
+        try:
+            respostas = plc_client.write(*[(c[1], c[3]) for c in comandos])
+            if not isinstance(respostas, list):
+                respostas = [respostas]
+        except Exception as e:
+            self._log('ERROR', self.source_name, f"Exceção na escrita de {[c[1] for c in comandos]}: {e}")
+            return verificacoes
+        if plc_client is self._plc_escrita:
+            self._ultima_comunicacao_escrita = time.monotonic()
+
+        for (tag_id, tag_endereco, tipo_dado, valor_convertido), response in zip(comandos, respostas):
+            erro_escrita = getattr(response, 'error', None)
+            if erro_escrita:
+                self._log('ERROR', self.source_name, f"Erro na escrita de '{tag_endereco}': {erro_escrita}")
+            elif tag_id in self._ids_ativos:
+                # A confirmação é feita pela leitura do próximo scan, sem bloquear o loop
+                verificacoes[tag_id] = (tag_endereco, tipo_dado, valor_convertido)
             else:
-                if self.log_enabled:
-                    log('WARN', self.source_name, f"Comando de escrita para tag desconhecida '{tag_id}' ignorado.")
+                self._log('INFO', self.source_name,
+                    f"Escrita na tag '{tag_id}' (endereço: '{tag_endereco}'): valor_enviado='{valor_convertido}' (tipo: '{tipo_dado}'), erro='None' (tag fora do scan, sem confirmação por leitura)")
+        return verificacoes
+
+    def _verificar_escrita(self, tag_id: str, resp):
+        """Confere uma escrita pendente com o valor lido no scan atual e registra o resultado."""
+        tag_endereco, tipo_dado, valor_convertido = self._pending_verifications.pop(tag_id)
+        if resp.error is None:
+            valor_lido = resp.value
+            tipo_valor_lido = type(valor_lido).__name__
+        else:
+            valor_lido = f"Erro leitura pós-escrita: {resp.error}"
+            tipo_valor_lido = None
+        escrita_efetivada = (valor_lido == valor_convertido)
+        self._log('INFO', self.source_name,
+            f"Escrita na tag '{tag_id}' (endereço: '{tag_endereco}'): valor_enviado='{valor_convertido}' (tipo: '{tipo_dado}'), erro='None', valor_lido='{valor_lido}' (tipo_lido: '{tipo_valor_lido}'), sucesso={'SIM' if escrita_efetivada else 'NÃO'}")
 
     def _read_tags(self, plc: LogixDriver, tags_para_ler: list):
-        """Lê as tags do PLC e atualiza o dicionário compartilhado."""
+        """Lê as tags do PLC e atualiza o estado local do scan."""
         if not tags_para_ler:
             return
             
-        resultados = plc.read(*tags_para_ler)
-        if len(tags_para_ler) == 1 and not isinstance(resultados, list):
-            resultados = [resultados]
-        
-        dados_lidos = {}
-        tags_ativas = [t for t in self.tags_config if t.get('scan_enabled', True)]
+        resultados = []
+        for chunk in self._read_chunks:
+            resp_chunk = plc.read(*chunk)
+            if isinstance(resp_chunk, list):
+                resultados.extend(resp_chunk)
+            else:
+                resultados.append(resp_chunk)
+        self._ultima_comunicacao = time.monotonic()
+
+        # (tag_id, erro, valor) por tag, na ordem de self._tags_ativas
+        leituras = []
+        adicionar = leituras.append
+        pendentes = self._pending_verifications
 
-        for i, resp in enumerate(resultados):
-            tag_config = tags_ativas[i]
+        for tag_config, resp in zip(self._tags_ativas, resultados):
             tag_id = tag_config['id']
-            
-            if resp.error is None:
-                dados_lidos[tag_id] = {'valor': resp.value, 'qualidade': 'boa', 'log': 'OK'}
-            else:
-                dados_lidos[tag_id] = {'valor': None, 'qualidade': 'ruim', 'log': f"Erro leitura: {resp.error}"}
-                
+            if pendentes and tag_id in pendentes:
+                self._verificar_escrita(tag_id, resp)
+            adicionar((tag_id, resp.error, resp.value))
+
+        dados_lidos = {
+            tag_id: {'valor': valor, 'qualidade': 'boa', 'log': 'OK'} if erro is None
+            else {'valor': None, 'qualidade': 'ruim', 'log': f"Erro leitura: {erro}"}
+            for tag_id, erro, valor in leituras
+        }
         self._update_shared_tags(dados_lidos)
 
     def _update_shared_status(self, status: str, detalhe: str):
         """Atualiza o status do driver no dicionário compartilhado."""
-        # Cria uma cópia temporária para evitar problemas de concorrência
-        current_data = self.shared_data.get(self.driver_id, {})
+        current_data = self._local_mirror
         new_data = {
             "status_conexao": status,
             "detalhe": detalhe,
@@ -234,65 +352,123 @@ class controllogixDriverProcess(Process):
             "tags": current_data.get("tags", {}),
             "log": detalhe if status != "conectado" and detalhe else (current_data.get("log", "") if status != "conectado" else "")
         }
+        self._local_mirror = new_data
         self.shared_data[self.driver_id] = new_data
 
     def _update_shared_tags(self, dados_lidos: Dict[str, Any]):
-        """Atualiza os dados das tags no dicionário compartilhado."""
+        """
+        Atualiza os dados das tags no estado local do scan.
+        A publicação no dicionário compartilhado é feita por `_flush_shared`.
+        """
 
         try:
-            current_data = self.shared_data.get(self.driver_id, {})
-            current_tags = current_data.get("tags", {})
-            
+            current_tags = self._local_tags
+            # Um único timestamp formatado por scan, compartilhado por todas as tags
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            templates = self._tag_status_templates
+            last_values = self._last_values
+
             for tag_id, data in dados_lidos.items():
-                tag_config = next((t for t in self.tags_config if t['id'] == tag_id), {})
-                tag_status = {
-                    "id": tag_id,
-                    "id_driver": self.driver_id,  # <<< ADICIONADO: O "CEP" ESSENCIAL
-                    "nome": tag_config.get('nome', '--'),
-                    "endereco": tag_config.get('endereco', '--'),
-                    "tipo_dado": tag_config.get('tipo_dado', '--'),
+                # Tags sem mudança mantêm o status (e o timestamp) da última alteração
+                assinatura = (data.get('valor'), data.get('qualidade'), data.get('log', ''))
+                if last_values.get(tag_id) == assinatura and tag_id in current_tags:
+                    continue
+                last_values[tag_id] = assinatura
+                self._tags_alteradas = True
+
+                template = templates.get(tag_id) or self._montar_template_status(tag_id, {})
+                current_tags[tag_id] = {
+                    **template,
                     "valor": data.get('valor'),
                     "qualidade": data.get('qualidade'),
                     "formato_lido": data.get('formato_lido', '--'),
-                    "formato_requerido": tag_config.get('tipo_dado', '--'),
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "timestamp": timestamp,
                     "log": data.get('log', '')
                 }
 
-                # Propaga campo_exibir se existir
-                if 'campo_exibir' in tag_config:
-                    tag_status['campo_exibir'] = tag_config['campo_exibir']
-                current_tags[tag_id] = tag_status
-            
-            current_data["tags"] = current_tags
-            self.shared_data[self.driver_id] = current_data
+        except Exception as e:
+            self._log('ERROR', self.source_name, f"Falha ao atualizar tags compartilhadas: {e}")
+
+    def _montar_template_status(self, tag_id: str, tag_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Monta os campos estáticos do status de uma tag (não mudam entre scans)."""
+        template = {
+            "id": tag_id,
+            "id_driver": self.driver_id,  # <<< ADICIONADO: O "CEP" ESSENCIAL
+            "nome": tag_config.get('nome', '--'),
+            "endereco": tag_config.get('endereco', '--'),
+            "tipo_dado": tag_config.get('tipo_dado', '--'),
+            "formato_requerido": tag_config.get('tipo_dado', '--'),
+        }
+        # Propaga campo_exibir se existir
+        if 'campo_exibir' in tag_config:
+            template['campo_exibir'] = tag_config['campo_exibir']
+        return template
 
+    def _flush_shared(self):
+        """
+        Publica as tags acumuladas no scan com uma única atribuição no dicionário compartilhado.
+        Scans sem nenhuma alteração não geram escrita.
+        """
+        if not self._tags_alteradas:
+            return
+        self._tags_alteradas = False
+        try:
+            current_data = self._local_mirror
+            current_data["tags"] = self._local_tags
+            self.shared_data[self.driver_id] = current_data
         except Exception as e:
-            if self.log_enabled:
-                log('ERROR', self.source_name, f"Falha ao atualizar tags compartilhadas: {e}")
-        
+            self._log('ERROR', self.source_name, f"Falha ao publicar tags compartilhadas: {e}")
 
     def _mark_all_tags_bad(self, log_msg: str):
         """Marca todas as tags como de qualidade ruim em caso de desconexão."""
-        dados_ruins = {
-            tag_config['id']: {"valor": None, "qualidade": "ruim", "log": log_msg}
-            for tag_config in self.tags_config
-        }
-        self._update_shared_tags(dados_ruins)
+        # Todas as tags apontam para a mesma entrada: basta ajustar a mensagem
+        self._all_bad_entry["log"] = log_msg
+        self._update_shared_tags(self._all_bad_template)
+        self._flush_shared()
 
     def _communication_loop(self, plc: LogixDriver, tags_para_ler: list):
-        """Loop principal de leitura e escrita enquanto conectado."""
-        while self.running and plc.connected:
-            start_time = time.time()
-            try:
-                self._read_tags(plc, tags_para_ler)
-                self._process_write_queue(plc)
-            except Exception as e:
-                if self.log_enabled:
-                    log('ERROR', self.source_name, f"Erro durante comunicação: {e}. Forçando reconexão...")
-                break # Quebra o loop para o 'run' principal tentar reconectar
-
-            elapsed = time.time() - start_time
-            sleep_time = self.scan_interval_s - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
\ No newline at end of file
+        """
+        Loop principal de leitura e escrita enquanto conectado.
+        Com sessão de escrita dedicada, a escrita do ciclo roda em uma thread auxiliar
+        ao mesmo tempo que a leitura (o I/O de socket do pycomm3 libera o GIL), e o
+        tempo do ciclo passa a ser max(leitura, escrita) em vez da soma.
+        """
+        plc_escrita = self._plc_escrita if self.dedicated_write_session else plc
+        sessoes = (plc, plc_escrita)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.source_name) as executor:
+            while self.running and all(s.connected for s in sessoes):
+                start_time = time.monotonic()
+                try:
+                    if plc_escrita is plc:
+                        self._read_tags(plc, tags_para_ler)
+                        self._pending_verifications.update(self._process_write_queue(plc))
+                    else:
+                        escrita = executor.submit(self._process_write_queue, plc_escrita)
+                        try:
+                            self._read_tags(plc, tags_para_ler)
+                        finally:
+                            # Aguarda a escrita mesmo se a leitura falhar: a sessão não pode ficar em uso
+                            verificacoes = escrita.result()
+                        self._pending_verifications.update(verificacoes)
+                    self._flush_shared()
+                    # Mantém as sessões ativas quando não há tráfego periódico (ex.: driver só de escrita)
+                    agora = time.monotonic()
+                    if agora - self._ultima_comunicacao >= self.keepalive_s:
+                        plc.get_plc_time()
+                        self._ultima_comunicacao = time.monotonic()
+                    if plc_escrita is not plc and agora - self._ultima_comunicacao_escrita >= self.keepalive_s:
+                        plc_escrita.get_plc_time()
+                        self._ultima_comunicacao_escrita = time.monotonic()
+                except Exception as e:
+                    self._log('ERROR', self.source_name, f"Erro durante comunicação: {e}. Forçando reconexão...")
+                    break # Quebra o loop para o 'run' principal tentar reconectar
+
+                # Aguarda o próximo scan, atendendo comandos de escrita assim que chegam
+                proximo_scan = start_time + self.scan_interval_s
+                while self.running:
+                    sleep_time = proximo_scan - time.monotonic()
+                    if sleep_time <= 0:
+                        break
+                    if self.write_queue.aguardar_item(timeout=sleep_time):
+                        self._pending_verifications.update(self._process_write_queue(plc_escrita))
\ No newline at end of file
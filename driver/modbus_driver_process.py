@@ -4,7 +4,7 @@
 CLPs (PLCs) compatíveis com o driver Modbus TCP padrão:
 
 O driver está compatível com qualquer CLP ou PLC que implemente o protocolo Modbus TCP conforme especificação aberta, 
-permitindo leitura/escrita de coils (bool), holding registers (int16, float32) e configuração de parâmetros via IP, porta e unit_id.
+permitindo leitura/escrita de coils (bool), holding registers (int16, int32, uint32, float32, double) e configuração de parâmetros via IP, porta e unit_id.
 
 Lista de CLPs certificados como compatíveis (testado ou documentado):
 
@@ -23,7 +23,8 @@ Lista de CLPs certificados como compatíveis (testado ou documentado):
 - Kinco (K5, K6, K7, FD, F2, etc.)
 
 Observação:
-- Para CLPs que usam ordem de bytes (endianess) diferente de big-endian para float/double, pode ser necessário ajuste na configuração de cada tag.
+- Para CLPs que usam ordem de bytes (endianess) diferente de big-endian em valores de 32/64 bits (int32, uint32, float, double),
+  configure `byte_order` na tag: 'big' (padrão), 'big_word_swap', 'little' ou 'little_word_swap'.
 - O driver não depende de funções proprietárias, apenas de endereçamento correto, tipos suportados e padrão Modbus TCP.
 - Compatível também com gateways Modbus TCP/IP para Modbus RTU e dispositivos Modbus industriais convencionais.
 
@@ -35,17 +36,214 @@ Referência Técnica:
 """
 
 
+import random
+import socket
 import struct
+import threading
 import time
 from datetime import datetime
 from multiprocessing import Process
+from queue import Empty
 
 from pyModbusTCP.client import ModbusClient
 
+# NumPy é opcional: sem ele, todos os valores são decodificados com struct
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Mova os imports para o topo para melhor prática e performance
 from modulos.logger import log
 import traceback
 
+# Códigos de função Modbus usados na leitura
+_FC_COILS = 1
+_FC_HOLDING_REGISTERS = 3
+
+# Máximo de registradores/coils por requisição de leitura agrupada
+# (limites do protocolo: 2000 coils e 125 holding registers, com margem)
+_MAX_LEITURA_POR_FUNCAO = {
+    _FC_COILS: 1968,
+    _FC_HOLDING_REGISTERS: 120,
+}
+
+# Máximo de coils/registradores por requisição de escrita agrupada
+# (limites do protocolo: 1968 coils e 123 registradores)
+_MAX_ESCRITA_POR_AREA = {
+    _FC_COILS: 1968,
+    _FC_HOLDING_REGISTERS: 123,
+}
+
+# Ordem dos bytes de valores de múltiplos registradores (campo `byte_order` da tag):
+# ordem -> (formato de cada registrador, inverter a ordem dos registradores)
+#   big              ABCD  (padrão Modbus)
+#   big_word_swap    CDAB  (comum em Delta, Schneider, WEG)
+#   little           DCBA
+#   little_word_swap BADC
+_ORDENS_BYTES = {
+    'big': ('>', False),
+    'big_word_swap': ('>', True),
+    'little': ('<', True),
+    'little_word_swap': ('<', False),
+}
+
+
+class _CodecRegistros:
+    """
+    Converte valores de múltiplos registradores (int32, uint32, float, double) com
+    `struct.Struct` pré-compilados para o tipo e a ordem de bytes da tag.
+    """
+    __slots__ = ('formato', 'largura', 'ordem', '_empacotar_regs', '_desempacotar_regs',
+                 '_empacotar_valor', '_desempacotar_valor', '_inverter')
+
+    def __init__(self, formato, largura, ordem='big'):
+        self.formato = formato
+        self.largura = largura
+        self.ordem = ordem
+        ordem_regs, self._inverter = _ORDENS_BYTES[ordem]
+        regs = struct.Struct(f"{ordem_regs}{largura}H")
+        valor = struct.Struct(f">{formato}")
+        self._empacotar_regs = regs.pack
+        self._desempacotar_regs = regs.unpack
+        self._empacotar_valor = valor.pack
+        self._desempacotar_valor = valor.unpack
+
+    def __call__(self, res, i):
+        """Decodifica o valor que começa na posição `i` do bloco de registradores lido."""
+        regs = res[i:i + self.largura]
+        if self._inverter:
+            regs = regs[::-1]
+        return self._desempacotar_valor(self._empacotar_regs(*regs))[0]
+
+    def codificar(self, valor):
+        """Converte o valor na lista de registradores a escrever."""
+        regs = list(self._desempacotar_regs(self._empacotar_valor(valor)))
+        if self._inverter:
+            regs.reverse()
+        return regs
+
+    def __reduce__(self):
+        # Objetos Struct não são serializáveis: o codec é recriado no processo do driver
+        return (_CodecRegistros, (self.formato, self.largura, self.ordem))
+
+
+def _decodificar_registro(res, i):
+    return res[i]
+
+
+# tipo_dado -> (função de leitura, largura em registradores/coils, formato struct do valor ou
+# None para valores de um registrador/coil, lidos diretamente)
+_TIPOS_LEITURA = {
+    'bool': (_FC_COILS, 1, None),
+    'int': (_FC_HOLDING_REGISTERS, 1, None),
+    'int16': (_FC_HOLDING_REGISTERS, 1, None),
+    'uint16': (_FC_HOLDING_REGISTERS, 1, None),
+    'int32': (_FC_HOLDING_REGISTERS, 2, 'i'),
+    'dint': (_FC_HOLDING_REGISTERS, 2, 'i'),
+    'uint32': (_FC_HOLDING_REGISTERS, 2, 'I'),
+    'udint': (_FC_HOLDING_REGISTERS, 2, 'I'),
+    'float': (_FC_HOLDING_REGISTERS, 2, 'f'),
+    'real': (_FC_HOLDING_REGISTERS, 2, 'f'),
+    'double': (_FC_HOLDING_REGISTERS, 4, 'd'),
+    'lreal': (_FC_HOLDING_REGISTERS, 4, 'd'),
+}
+
+
+# Mínimo de tags de um mesmo codec num grupo para decodificá-las de uma vez com NumPy
+_MIN_DECODIFICACAO_VETORIAL = 8
+
+# formato struct -> tipo NumPy equivalente (big-endian)
+_DTYPES_VALOR = {'i': '>i4', 'I': '>u4', 'f': '>f4', 'd': '>f8'}
+
+
+class _GrupoLeitura:
+    """Uma requisição de leitura Modbus que cobre várias tags de endereços próximos."""
+    __slots__ = ('funcao', 'inicio', 'quantidade', 'divisor', 'membros', 'vetoriais', 'decodificar')
+
+    def __init__(self, funcao, inicio, divisor=1):
+        self.funcao = funcao
+        self.inicio = inicio
+        self.quantidade = 0
+        self.divisor = divisor  # o grupo é lido a cada `divisor` ciclos de scan
+        self.membros = []  # (tag_id, deslocamento no bloco lido, decodificador)
+        self.vetoriais = []  # _DecodificacaoVetorial das tags de múltiplos registradores numerosas
+        self.decodificar = None  # função gerada por `compilar` (não serializável: criada no processo do driver)
+
+    def __getstate__(self):
+        return {nome: getattr(self, nome) for nome in self.__slots__ if nome != 'decodificar'}
+
+    def __setstate__(self, estado):
+        for nome, valor in estado.items():
+            setattr(self, nome, valor)
+        self.decodificar = None
+
+    def compilar(self):
+        """
+        Gera uma função especializada que decodifica todos os membros do grupo sem
+        despacho por tipo: tags de um registrador viram `res[i]` e as de múltiplos
+        registradores chamam diretamente os `struct` pré-compilados do seu codec, com a
+        ordem dos registradores já resolvida no código gerado.
+        """
+        linhas = ["def decodificar(res, dados_lidos):"]
+        namespace = {}
+        for n, (tag_id, deslocamento, decodificador) in enumerate(self.membros):
+            if isinstance(decodificador, _CodecRegistros):
+                indices = list(range(deslocamento, deslocamento + decodificador.largura))
+                if decodificador._inverter:
+                    indices.reverse()
+                namespace[f"_v{n}"] = decodificador._desempacotar_valor
+                namespace[f"_r{n}"] = decodificador._empacotar_regs
+                regs = ", ".join(f"res[{i}]" for i in indices)
+                valor = f"_v{n}(_r{n}({regs}))[0]"
+            else:
+                valor = f"res[{deslocamento}]"
+            linhas.append(f"    dados_lidos[{tag_id!r}] = {{'valor': {valor}, 'qualidade': 'boa', 'log': 'OK'}}")
+        if len(linhas) == 1:
+            linhas.append("    pass")
+        exec(compile("\n".join(linhas), f"<grupo modbus {self.funcao}:{self.inicio}>", "exec"), namespace)
+        self.decodificar = namespace["decodificar"]
+        return self.decodificar
+
+    def separar_vetoriais(self):
+        """
+        Move para decodificação vetorial (NumPy) os membros de um mesmo codec quando
+        são numerosos no grupo; os demais continuam decodificados um a um.
+        """
+        if np is None:
+            return
+        por_codec = {}
+        for membro in self.membros:
+            if isinstance(membro[2], _CodecRegistros):
+                por_codec.setdefault(membro[2], []).append(membro)
+        for codec, membros in por_codec.items():
+            if len(membros) < _MIN_DECODIFICACAO_VETORIAL:
+                continue
+            self.vetoriais.append(_DecodificacaoVetorial(codec, [m[0] for m in membros], [m[1] for m in membros]))
+            removidos = {id(m) for m in membros}
+            self.membros = [m for m in self.membros if id(m) not in removidos]
+
+
+class _DecodificacaoVetorial:
+    """Decodifica de uma vez, com NumPy, todas as tags de um mesmo codec dentro de um bloco lido."""
+    __slots__ = ('tag_ids', 'indices', 'dtype_regs', 'dtype_valor', 'inverter')
+
+    def __init__(self, codec, tag_ids, deslocamentos):
+        ordem_regs, self.inverter = _ORDENS_BYTES[codec.ordem]
+        self.tag_ids = tag_ids
+        # Matriz (tags x largura) com a posição de cada registrador no bloco lido
+        self.indices = np.asarray(deslocamentos)[:, None] + np.arange(codec.largura)
+        self.dtype_regs = np.dtype(f"{ordem_regs}u2")
+        self.dtype_valor = np.dtype(_DTYPES_VALOR[codec.formato])
+
+    def __call__(self, regs, dados_lidos):
+        palavras = regs[self.indices]
+        if self.inverter:
+            palavras = palavras[:, ::-1]
+        valores = np.frombuffer(palavras.astype(self.dtype_regs).tobytes(), dtype=self.dtype_valor).tolist()
+        for tag_id, valor in zip(self.tag_ids, valores):
+            dados_lidos[tag_id] = {"valor": valor, "qualidade": "boa", "log": "OK"}
+
 class ModbusDriverProcess(Process):
     """
     Processo autônomo e robusto que gerencia a comunicação com um dispositivo Modbus TCP.
@@ -66,9 +264,25 @@ class ModbusDriverProcess(Process):
         self.port = config.get('porta', 502)
         self.slave_id = config.get('slave_id', 1)
         self.scan_interval_s = config.get('scan_interval', 1000) / 1000.0
+        # Com adaptive_scan, o intervalo efetivo cresce quando o ciclo medido se aproxima do configurado
+        self.adaptive_scan = config.get('adaptive_scan', False)
+        self._ema_ciclo_s = 0.0
+        self._ciclos_lentos = 0
+        self._aviso_ciclo_lento = False
+        self._ema_publicada_ms = None
         self.timeout_s = config.get('timeout', 5000) / 1000.0
+        # Timeout só da abertura da conexão TCP: curto, para que um CLP inacessível seja detectado
+        # rapidamente sem reduzir o timeout das requisições (`timeout`)
+        self.connect_timeout_s = config.get('connect_timeout', min(config.get('timeout', 5000), 1000)) / 1000.0
         self.log_enabled = driver_config.get('config', {}).get('log_enabled', True)
         self.retry_count = driver_config.get('retry_count', 3)
+        # Backoff exponencial com jitter entre tentativas de conexão (evita que vários drivers
+        # reconectem ao mesmo tempo quando um CLP ou switch volta)
+        self.retry_backoff_base_s = config.get('retry_backoff_base', 500) / 1000.0
+        self.retry_backoff_max_s = config.get('retry_backoff_max', 30000) / 1000.0
+        self._falhas_consecutivas = 0
+        # Maior intervalo de endereços não configurados que ainda é lido junto no mesmo grupo
+        self.read_gap = max(0, int(config.get('read_gap', 4)))
 
         # Objetos compartilhados
         self.shared_data = shared_data
@@ -76,12 +290,118 @@ class ModbusDriverProcess(Process):
 
         # Estado interno
         self.client = None
+        self._host_resolvido = None  # IP resolvido de `self.ip` (evita DNS a cada novo cliente)
         self.running = False
 
+        # Índices das tags calculados uma única vez (evitam buscas lineares na escrita e na atualização)
+        self._tag_by_id = {t['id']: t for t in tags_config}
+        self._tag_ids_in_order = [t['id'] for t in tags_config]
+        # Campos estáticos do status de cada tag (não mudam entre scans)
+        self._tag_status_template = {t['id']: self._montar_template_status(t['id'], t) for t in tags_config}
+
+        # Codecs dos tipos de múltiplos registradores, por tag (usados na leitura e na escrita)
+        self._codecs = self._montar_codecs()
+
+        # Plano de leitura calculado uma única vez (as tags de um processo não mudam em execução)
+        self._read_plan, self._leituras_invalidas = self._montar_plano_leitura()
+        self._tick_counter = 0
+
+        # Registro completo deste driver (status + tags), mantido no processo e publicado no
+        # dicionário compartilhado uma única vez por ciclo, apenas quando algo mudou
+        self._local_snapshot = {}
+        self._last_values = {}  # tag_id -> (valor, qualidade, log) publicado
+        self._snapshot_alterado = False
+
+    def _montar_codecs(self):
+        """Resolve, por tag, o codec do tipo e da `byte_order` configurados (tags de um registrador não têm codec)."""
+        codecs = {}
+        compartilhados = {}
+        for tag in self.tags_config:
+            leitura = _TIPOS_LEITURA.get(tag.get('tipo_dado', 'bool'))
+            if leitura is None or leitura[2] is None:
+                continue
+            _, largura, formato = leitura
+            ordem = tag.get('byte_order', 'big')
+            if ordem not in _ORDENS_BYTES:
+                if self.log_enabled:
+                    log('WARN', self.source_name, f"byte_order '{ordem}' inválido na tag '{tag['id']}'. Usando 'big'.")
+                ordem = 'big'
+            chave = (formato, largura, ordem)
+            if chave not in compartilhados:
+                compartilhados[chave] = _CodecRegistros(formato, largura, ordem)
+            codecs[tag['id']] = compartilhados[chave]
+        return codecs
+
+    def _montar_plano_leitura(self):
+        """
+        Agrupa as tags em scan por função Modbus e endereços contíguos (ou separados por até
+        `read_gap` endereços), respeitando o limite de cada requisição. Cada grupo é lido com uma
+        única requisição e o resultado é fatiado de volta para as tags.
+        Tags com `scan_divisor` (ou `scan_interval_ms`) diferentes ficam em grupos separados,
+        para que tags lentas não sejam lidas junto com as rápidas.
+        Retorna (grupos, leituras_invalidas), onde as inválidas são publicadas como ruins a cada scan.
+        """
+        leituras = []  # (funcao, divisor, endereco, largura, tag_id, decodificador)
+        invalidas = {}
+        for tag in self.tags_config:
+            if not tag.get('scan_enabled', True):
+                continue
+            tag_id = tag['id']
+            tipo = tag.get('tipo_dado', 'bool')
+            try:
+                addr = int(tag.get('endereco', -1))
+            except (TypeError, ValueError):
+                addr = -1
+            if addr < 0:
+                invalidas[tag_id] = {"valor": None, "qualidade": "ruim", "log": "Endereço inválido"}
+                continue
+            leitura = _TIPOS_LEITURA.get(tipo)
+            if leitura is None:
+                invalidas[tag_id] = {"valor": None, "qualidade": "ruim", "log": f"Tipo não suportado: {tipo}"}
+                continue
+            funcao, largura, _ = leitura
+            decodificador = self._codecs.get(tag_id, _decodificar_registro)
+            divisor = self._divisor_scan(tag)
+            leituras.append((funcao, divisor, addr, largura, tag_id, decodificador))
+
+        leituras.sort(key=lambda l: (l[0], l[1], l[2]))
+        grupos = []
+        grupo = None
+        for funcao, divisor, addr, largura, tag_id, decodificador in leituras:
+            fim = addr + largura
+            if (grupo is None or grupo.funcao != funcao or grupo.divisor != divisor
+                    or addr - (grupo.inicio + grupo.quantidade) > self.read_gap
+                    or fim - grupo.inicio > _MAX_LEITURA_POR_FUNCAO[funcao]):
+                grupo = _GrupoLeitura(funcao, addr, divisor)
+                grupos.append(grupo)
+            grupo.quantidade = max(grupo.quantidade, fim - grupo.inicio)
+            grupo.membros.append((tag_id, addr - grupo.inicio, decodificador))
+        for grupo in grupos:
+            grupo.separar_vetoriais()
+        return grupos, invalidas
+
+    def _divisor_scan(self, tag):
+        """
+        Quantos ciclos de scan separam duas leituras da tag: `scan_divisor` explícito ou
+        `scan_interval_ms` convertido para múltiplos do scan do driver (mínimo 1).
+        """
+        try:
+            if tag.get('scan_divisor') is not None:
+                return max(1, int(tag['scan_divisor']))
+            if tag.get('scan_interval_ms') is not None:
+                return max(1, round(float(tag['scan_interval_ms']) / 1000.0 / self.scan_interval_s))
+        except (TypeError, ValueError, ZeroDivisionError):
+            if self.log_enabled:
+                log('WARN', self.source_name, f"Intervalo de scan inválido na tag '{tag['id']}'. Usando o scan do driver.")
+        return 1
+
 
     def run(self):
         """O coração do processo. Este método é executado quando `process.start()` é chamado."""
         self.running = True
+        # Estado inicial publicado pelo sistema (fase, modo de operação, restrições...)
+        self._local_snapshot = dict(self.shared_data.get(self.driver_id, {}))
+        self._local_snapshot.setdefault("tags", {})
         if self.log_enabled:
             log('INFO', self.source_name, f"[{self.driver_config.get('tipo', 'modbus')}] Processo iniciado.")
 
@@ -90,6 +410,7 @@ class ModbusDriverProcess(Process):
             if self.log_enabled: log('ERROR', self.source_name, detalhe_erro)
             self._update_shared_status("desconectado", detalhe_erro)
             self._mark_all_tags_bad(detalhe_erro)
+            self._flush_shared()
             return
 
         last_logged_status = None
@@ -103,11 +424,9 @@ class ModbusDriverProcess(Process):
             # --- Loop de Tentativas de Conexão ---
             while not conectado and tentativas_de_conexao < self.retry_count and self.running:
                 try:
-                    self.client = ModbusClient(host=self.ip, port=self.port, unit_id=self.slave_id, 
-                                            timeout=self.timeout_s, auto_open=False, auto_close=False)
-                    
-                    if self.client.open():
+                    if self._conectar_cliente():
                         conectado = True # Conexão bem-sucedida
+                        self._falhas_consecutivas = 0
 
                         if last_logged_status != 'conectado':
                             if self.log_enabled: log('INFO', self.source_name, "Conexão estabelecida com sucesso.")
@@ -131,181 +450,390 @@ class ModbusDriverProcess(Process):
                     if last_logged_status != 'desconectado':
                         self._mark_all_tags_bad("Desconectado")
                         last_logged_status = 'desconectado'
+                    # Status e tags ruins publicados juntos
+                    self._flush_shared()
                     
                     if self.client and self.client.is_open:
                         self.client.close()
+                    if not isinstance(e, ConnectionError):
+                        # Falha inesperada: o cliente (e o endereço resolvido) é recriado na próxima tentativa
+                        self.client = None
+                        self._host_resolvido = None
 
+                    self._falhas_consecutivas += 1
                     if tentativas_de_conexao < self.retry_count:
-                        time.sleep(2) # Pausa curta entre as tentativas
+                        time.sleep(self._tempo_backoff())
             
-            # Se saiu do loop de tentativas sem sucesso, faz uma pausa longa
+            # Se saiu do loop de tentativas sem sucesso, faz uma pausa maior (o backoff continua crescendo)
             if self.running and not conectado:
+                espera = self._tempo_backoff()
                 if self.log_enabled:
-                    log('WARN', self.source_name, f"Máximo de {self.retry_count} tentativas de conexão atingido. Aguardando 10s.")
-                time.sleep(10)
+                    log('WARN', self.source_name, f"Máximo de {self.retry_count} tentativas de conexão atingido. Aguardando {espera:.1f}s.")
+                time.sleep(espera)
+
+    def _tempo_backoff(self) -> float:
+        """Espera antes da próxima tentativa: base * 2^falhas, limitada ao máximo, com jitter de ±50%."""
+        expoente = min(self._falhas_consecutivas, 16)
+        atraso = min(self.retry_backoff_max_s, self.retry_backoff_base_s * (2 ** expoente))
+        return atraso * (0.5 + random.random())
+
+    def _conectar_cliente(self) -> bool:
+        """
+        Abre a conexão TCP reutilizando o mesmo ModbusClient entre reconexões e
+        ajusta o socket para as requisições pequenas e frequentes do Modbus.
+        """
+        if self.client is None:
+            self.client = ModbusClient(host=self._resolver_host(), port=self.port, unit_id=self.slave_id,
+                                       timeout=self.timeout_s, auto_open=False, auto_close=False)
+        # O pyModbusTCP usa o mesmo timeout no connect e nas requisições: troca durante a abertura
+        self._definir_timeout(self.connect_timeout_s)
+        try:
+            if not self.client.open():
+                return False
+        finally:
+            self._definir_timeout(self.timeout_s)
+        self._configurar_socket()
+        return True
+
+    def _resolver_host(self) -> str:
+        """Resolve o nome do CLP uma vez; se o DNS falhar, usa o nome como configurado."""
+        if self._host_resolvido is None:
+            try:
+                self._host_resolvido = socket.gethostbyname(self.ip)
+            except OSError:
+                return self.ip
+        return self._host_resolvido
+
+    def _definir_timeout(self, timeout_s):
+        # pyModbusTCP 0.2+ expõe `timeout` como propriedade; 0.1.x como método getter/setter
+        if callable(getattr(type(self.client), 'timeout', None)):
+            self.client.timeout(timeout_s)
+        else:
+            self.client.timeout = timeout_s
+
+    def _configurar_socket(self):
+        """
+        Desativa o algoritmo de Nagle (PDUs de ~12 bytes seriam retidas pelo kernel por
+        dezenas de ms) e ativa o TCP keepalive para detectar conexões mortas.
+        """
+        # pyModbusTCP 0.2+ expõe `_sock`; versões 0.1.x usam o atributo privado `__sock`
+        sock = getattr(self.client, '_sock', None) or getattr(self.client, '_ModbusClient__sock', None)
+        if sock is None:
+            return
+        try:
+            sock.settimeout(self.timeout_s)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Parâmetros do keepalive, quando o sistema operacional os expõe
+            for opcao, valor in (('TCP_KEEPIDLE', 10), ('TCP_KEEPINTVL', 5), ('TCP_KEEPCNT', 3)):
+                if hasattr(socket, opcao):
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opcao), valor)
+        except OSError as e:
+            if self.log_enabled:
+                log('WARN', self.source_name, f"Não foi possível ajustar as opções do socket: {e}")
 
     def _read_all_tags(self):
-        """Lê todas as tags configuradas e atualiza o dicionário compartilhado."""
-        dados_lidos = {}
-        for tag in self.tags_config:
-            if not tag.get('scan_enabled', True):
+        """
+        Lê todas as tags configuradas (uma requisição por grupo do plano) e atualiza o dicionário compartilhado.
+        Comandos de escrita que chegam durante o scan são enviados entre um grupo e outro,
+        sem esperar o fim da leitura completa.
+        """
+        dados_lidos = dict(self._leituras_invalidas)
+        tick = self._tick_counter
+        self._tick_counter += 1
+        fila_escrita = self.write_queue
+        for grupo in self._read_plan:
+            # Grupos lentos são pulados: suas tags mantêm o último valor publicado
+            if tick % grupo.divisor:
                 continue
-            
-            tag_id = tag['id']
-            addr = int(tag.get('endereco', -1))
-            tipo = tag.get('tipo_dado', 'bool')
-            
-            valor, log_msg = self._read_single_tag(addr, tipo, tag)
-            
-            dados_lidos[tag_id] = {
-                "valor": valor,
-                "qualidade": "boa" if valor is not None else "ruim",
-                "log": log_msg
-            }
+            if not fila_escrita.empty():
+                self._process_write_queue()
+            res = self._read_group(grupo)
+            if not res or len(res) < grupo.quantidade:
+                for tag_id, _, _ in grupo.membros:
+                    dados_lidos[tag_id] = {"valor": None, "qualidade": "ruim", "log": "Resposta inválida"}
+                for vetorial in grupo.vetoriais:
+                    for tag_id in vetorial.tag_ids:
+                        dados_lidos[tag_id] = {"valor": None, "qualidade": "ruim", "log": "Resposta inválida"}
+                continue
+            (grupo.decodificar or grupo.compilar())(res, dados_lidos)
+            if grupo.vetoriais:
+                regs = np.asarray(res, dtype=np.uint16)
+                for decodificar_vetorial in grupo.vetoriais:
+                    decodificar_vetorial(regs, dados_lidos)
         self._update_shared_tags(dados_lidos)
 
-    def _read_single_tag(self, addr, tipo, tag_config):
-        """Lê um único valor Modbus com base no tipo."""
-        if addr < 0:
-            return None, "Endereço inválido"
-            
+    def _read_group(self, grupo):
+        """Executa a requisição de leitura de um grupo do plano."""
         try:
-            if tipo == 'bool':
-                res = self.client.read_coils(addr, 1)
-                return (res[0] if res else None), "OK"
-            
-            elif tipo in ['int', 'int16', 'uint16']:
-                res = self.client.read_holding_registers(addr, 1)
-                return (res[0] if res else None), "OK"
-
-            elif tipo in ['float', 'real']:
-                res = self.client.read_holding_registers(addr, 2)
-                if res and len(res) == 2:
-                    # Ordem dos bytes pode variar, aqui usamos Big-Endian (padrão)
-                    # Use '>f' para Big-Endian, '<f' para Little-Endian
-                    packer = struct.pack('>HH', *res)
-                    valor = struct.unpack('>f', packer)[0]
-                    return valor, "OK"
-                return None, "Resposta inválida para float"
-
-            # Adicione outros tipos como 'double' ou 'string' aqui se necessário
-            
-            else:
-                return None, f"Tipo não suportado: {tipo}"
-                
+            if grupo.funcao == _FC_COILS:
+                return self.client.read_coils(grupo.inicio, grupo.quantidade)
+            return self.client.read_holding_registers(grupo.inicio, grupo.quantidade)
         except Exception as ex:
-            # Esta exceção pega erros de comunicação durante a leitura de uma tag
-            raise IOError(f"Falha na leitura do endereço {addr}: {ex}")
+            # Esta exceção pega erros de comunicação durante a leitura de um grupo
+            raise IOError(f"Falha na leitura do endereço {grupo.inicio} ({grupo.quantidade} posições): {ex}")
 
     def _process_write_queue(self):
-        """Verifica e processa comandos na fila de escrita."""
-        while not self.write_queue.empty():
+        """
+        Drena a fila de escrita e envia os comandos agrupados: escritas em endereços
+        contíguos da mesma área viram uma única `write_multiple_coils`/`write_multiple_registers`.
+        """
+        comandos = []  # (area, endereco, valores, tag_id, tipo, valor_original)
+        while True:
             try:
                 tag_id, valor_para_escrever = self.write_queue.get_nowait()
-                tag_config = next((t for t in self.tags_config if t['id'] == tag_id), None)
-                
-                if not tag_config or not tag_config.get('escrita_permitida'):
-                    if self.log_enabled:
-                        log('WARN', self.source_name, f"Escrita ignorada para tag '{tag_id}' (não encontrada ou sem permissão).")
-                    continue
-
-                addr = int(tag_config.get('endereco'))
-                tipo = tag_config.get('tipo_dado')
-
-                if tipo == 'bool':
-                    result = self.client.write_single_coil(addr, bool(valor_para_escrever))
-                    if self.log_enabled:
-                        log('INFO', self.source_name, f"Escrita na tag '{tag_id}' (endereço: {addr}, tipo: bool): valor='{valor_para_escrever}', resultado='{result}'")
-                elif tipo in ['int', 'int16', 'uint16']:
-                    result = self.client.write_single_register(addr, int(valor_para_escrever))
-                    if self.log_enabled:
-                        log('INFO', self.source_name, f"Escrita na tag '{tag_id}' (endereço: {addr}, tipo: int): valor='{valor_para_escrever}', resultado='{result}'")
-                elif tipo in ['float', 'real']:
-                    packer = struct.pack('>f', float(valor_para_escrever))
-                    regs = struct.unpack('>HH', packer)
-                    result = self.client.write_multiple_registers(addr, list(regs))
-                    if self.log_enabled:
-                        log('INFO', self.source_name, f"Escrita na tag '{tag_id}' (endereço: {addr}, tipo: float): valor='{valor_para_escrever}', resultado='{result}'")
-                else:
-                    if self.log_enabled:
-                        log('ERROR', self.source_name, f"Tipo de dado '{tipo}' não suportado para escrita na tag '{tag_id}'.")
-
+            except Empty:
+                break
+            try:
+                comando = self._resolver_escrita(tag_id, valor_para_escrever)
+                if comando:
+                    comandos.append(comando)
             except Exception as e:
                 if self.log_enabled:
                     log('ERROR', self.source_name, f"Exceção na escrita: {e}")
 
-    def _update_shared_status(self, status: str, detalhe: str):
-        """Atualiza o status geral do driver no dicionário compartilhado."""
+        if comandos:
+            for lote in self._agrupar_escritas(comandos):
+                self._write_batch(lote)
+
+    def _resolver_escrita(self, tag_id, valor_para_escrever):
+        """Valida o comando e converte o valor nas posições Modbus a escrever."""
+        tag_config = self._tag_by_id.get(tag_id)
+        if not tag_config or not tag_config.get('escrita_permitida'):
+            if self.log_enabled:
+                log('WARN', self.source_name, f"Escrita ignorada para tag '{tag_id}' (não encontrada ou sem permissão).")
+            return None
+
+        addr = int(tag_config.get('endereco'))
+        tipo = tag_config.get('tipo_dado')
+
+        if tipo == 'bool':
+            return (_FC_COILS, addr, [bool(valor_para_escrever)], tag_id, tipo, valor_para_escrever)
+        if tipo in ['int', 'int16', 'uint16']:
+            return (_FC_HOLDING_REGISTERS, addr, [int(valor_para_escrever)], tag_id, tipo, valor_para_escrever)
+        if tag_id in self._codecs:
+            codec = self._codecs[tag_id]
+            valor = float(valor_para_escrever) if codec.formato in 'fd' else int(valor_para_escrever)
+            return (_FC_HOLDING_REGISTERS, addr, codec.codificar(valor), tag_id, tipo, valor_para_escrever)
+
+        if self.log_enabled:
+            log('ERROR', self.source_name, f"Tipo de dado '{tipo}' não suportado para escrita na tag '{tag_id}'.")
+        return None
+
+    @staticmethod
+    def _agrupar_escritas(comandos):
+        """
+        Junta em lotes os comandos consecutivos (na ordem de chegada) da mesma área cujos
+        endereços continuam exatamente onde o anterior terminou, respeitando o limite de cada
+        requisição. A ordem é preservada e nenhum comando é descartado: um pulso 1→0 na mesma
+        bobina ou tags sobrepostas são escritos na sequência recebida.
+        """
+        lotes = []
+        lote = None
+        total = 0
+        for comando in comandos:
+            area, addr, valores = comando[0], comando[1], comando[2]
+            if (lote is None or lote[0][0] != area or addr != lote[-1][1] + len(lote[-1][2])
+                    or total + len(valores) > _MAX_ESCRITA_POR_AREA[area]):
+                lote = []
+                total = 0
+                lotes.append(lote)
+            lote.append(comando)
+            total += len(valores)
+        return lotes
+
+    def _write_batch(self, lote):
+        """Envia um lote de escritas contíguas com uma única requisição e registra cada tag."""
+        area, base = lote[0][0], lote[0][1]
+        valores = [v for comando in lote for v in comando[2]]
         try:
-            # Usar .get() para segurança, embora o dict deva existir
-            driver_data = self.shared_data.get(self.driver_id, {})
-            if hasattr(driver_data, 'update'):
-                driver_data.update({
-                    "status_conexao": status,
-                    "detalhe": detalhe,
-                    "timestamp": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-                })
+            if area == _FC_COILS:
+                if len(valores) == 1:
+                    result = self.client.write_single_coil(base, valores[0])
+                else:
+                    result = self.client.write_multiple_coils(base, valores)
+            elif len(valores) == 1:
+                result = self.client.write_single_register(base, valores[0])
+            else:
+                result = self.client.write_multiple_registers(base, valores)
         except Exception as e:
             if self.log_enabled:
-                log('ERROR', self.source_name, f"Falha ao atualizar status compartilhado: {e}")
+                log('ERROR', self.source_name, f"Exceção na escrita das tags {[c[3] for c in lote]}: {e}")
+            return
+
+        if self.log_enabled:
+            for _, addr, _, tag_id, tipo, valor_original in lote:
+                log('INFO', self.source_name, f"Escrita na tag '{tag_id}' (endereço: {addr}, tipo: {tipo}): valor='{valor_original}', resultado='{result}'")
+
+    def _update_shared_status(self, status: str, detalhe: str):
+        """
+        Atualiza o status geral do driver no registro local.
+        A publicação no dicionário compartilhado é feita por `_flush_shared`.
+        """
+        self._local_snapshot.update({
+            "status_conexao": status,
+            "detalhe": detalhe,
+            "timestamp": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        })
+        self._snapshot_alterado = True
 
     def _update_shared_tags(self, dados_lidos: dict):
-        """Atualiza os dados das tags no dicionário compartilhado."""
+        """
+        Atualiza os dados das tags no registro local; tags sem mudança de valor, qualidade
+        ou log não são reescritas. A publicação é feita por `_flush_shared`.
+        """
         try:
-            driver_data = self.shared_data.get(self.driver_id)
-            if not hasattr(driver_data, 'get'):
-                return
-
-            current_tags = driver_data.get("tags", {})
+            current_tags = self._local_snapshot.setdefault("tags", {})
+            last_values = self._last_values
+            templates = self._tag_status_template
+            # Um único timestamp formatado por scan, compartilhado por todas as tags
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             for tag_id, data in dados_lidos.items():
-                tag_config = next((t for t in self.tags_config if t['id'] == tag_id), {})
-                tag_status = {
-                    "id": tag_id,
-                    "id_driver": self.driver_id,
-                    "nome": tag_config.get('nome', '--'),
-                    "endereco": tag_config.get('endereco', '--'),
-                    "tipo_dado": tag_config.get('tipo_dado', '--'),
-                    "valor": data.get('valor'),
-                    "qualidade": data.get('qualidade'),
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "log": data.get('log', '')
-                }
-                # Propaga campo_exibir se existir
-                if 'campo_exibir' in tag_config:
-                    tag_status['campo_exibir'] = tag_config['campo_exibir']
+                assinatura = (data.get('valor'), data.get('qualidade'), data.get('log', ''))
+                if last_values.get(tag_id) == assinatura and tag_id in current_tags:
+                    continue
+                last_values[tag_id] = assinatura
+                self._snapshot_alterado = True
+
+                template = templates.get(tag_id) or self._montar_template_status(tag_id, {})
+                tag_status = template.copy()
+                tag_status['valor'] = data.get('valor')
+                tag_status['qualidade'] = data.get('qualidade')
+                tag_status['timestamp'] = timestamp
+                tag_status['log'] = data.get('log', '')
                 current_tags[tag_id] = tag_status
 
-            driver_data["tags"] = current_tags
-            self.shared_data[self.driver_id] = driver_data
-
         except Exception as e:
             if self.log_enabled:
                 log('ERROR', self.source_name, f"Falha ao atualizar tags compartilhadas: {e}")
 
+    def _montar_template_status(self, tag_id, tag_config):
+        """Monta os campos estáticos do status de uma tag."""
+        template = {
+            "id": tag_id,
+            "id_driver": self.driver_id,
+            "nome": tag_config.get('nome', '--'),
+            "endereco": tag_config.get('endereco', '--'),
+            "tipo_dado": tag_config.get('tipo_dado', '--'),
+        }
+        # Propaga campo_exibir se existir
+        if 'campo_exibir' in tag_config:
+            template['campo_exibir'] = tag_config['campo_exibir']
+        return template
+
+    def _flush_shared(self):
+        """
+        Publica o registro local (status + tags) com uma única atribuição no dicionário
+        compartilhado. Ciclos sem nenhuma alteração não geram escrita.
+        """
+        if not self._snapshot_alterado:
+            return
+        self._snapshot_alterado = False
+        try:
+            self.shared_data[self.driver_id] = self._local_snapshot
+        except Exception as e:
+            if self.log_enabled:
+                log('ERROR', self.source_name, f"Falha ao publicar dados compartilhados: {e}")
+
     def _mark_all_tags_bad(self, log_msg: str):
         """Marca todas as tags como de qualidade ruim em caso de desconexão."""
-        dados_ruins = {
-            tag['id']: {"valor": None, "qualidade": "ruim", "log": log_msg}
-            for tag in self.tags_config
-        }
-        self._update_shared_tags(dados_ruins)
+        # Ajusta no próprio registro local as tags que ainda não estão ruins com esta mensagem;
+        # a publicação é feita por `_flush_shared`
+        current_tags = self._local_snapshot.setdefault("tags", {})
+        assinatura = (None, "ruim", log_msg)
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        for tag_id in self._tag_ids_in_order:
+            if self._last_values.get(tag_id) == assinatura and tag_id in current_tags:
+                continue
+            self._last_values[tag_id] = assinatura
+            tag_status = current_tags.get(tag_id)
+            if tag_status is None:
+                tag_status = current_tags[tag_id] = self._tag_status_template[tag_id].copy()
+            tag_status['valor'] = None
+            tag_status['qualidade'] = "ruim"
+            tag_status['timestamp'] = timestamp
+            tag_status['log'] = log_msg
+            self._snapshot_alterado = True
+
+    def _intervalo_efetivo(self, elapsed: float) -> float:
+        """
+        Atualiza a média móvel exponencial do tempo de ciclo e devolve o intervalo até o próximo scan.
+        Ciclos que consomem mais de 80% do intervalo por vários scans seguidos geram um aviso e,
+        com `adaptive_scan`, o intervalo passa a 1,2x a média medida (evita sobrecarregar o CLP).
+        """
+        self._ema_ciclo_s = elapsed if not self._ema_ciclo_s else 0.9 * self._ema_ciclo_s + 0.1 * elapsed
+        ema = self._ema_ciclo_s
+
+        if ema > 0.8 * self.scan_interval_s:
+            self._ciclos_lentos += 1
+            if self._ciclos_lentos >= 5 and not self._aviso_ciclo_lento:
+                self._aviso_ciclo_lento = True
+                if self.log_enabled:
+                    log('WARN', self.source_name, f"Tempo de ciclo ({ema * 1000:.0f} ms) próximo do scan_interval ({self.scan_interval_s * 1000:.0f} ms).")
+        else:
+            self._ciclos_lentos = 0
+            self._aviso_ciclo_lento = False
+
+        # Publica o tempo de ciclo quando varia mais de 10%, sem forçar publicação a cada scan
+        ema_ms = round(ema * 1000, 1)
+        if self._ema_publicada_ms is None or abs(ema_ms - self._ema_publicada_ms) > 0.1 * self._ema_publicada_ms:
+            self._ema_publicada_ms = ema_ms
+            self._local_snapshot["tempo_ciclo_ms"] = ema_ms
+            self._snapshot_alterado = True
+
+        if self.adaptive_scan and self._ciclos_lentos >= 5:
+            return max(self.scan_interval_s, ema * 1.2)
+        return self.scan_interval_s
 
     def _communication_loop(self):
         """Loop principal de leitura e escrita enquanto conectado."""
         while self.running and self.client and self.client.is_open:
-            start_time = time.time()
+            start_time = time.monotonic()
             try:
                 self._read_all_tags()
                 self._process_write_queue()
+                self._flush_shared()
             except Exception as e:
                 if self.log_enabled:
                     log('ERROR', self.source_name, f"Erro durante comunicação: {e}. Forçando reconexão...")
                 break # Quebra o loop para o 'run' principal tentar reconectar
 
-            elapsed = time.time() - start_time
-            sleep_time = self.scan_interval_s - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+            # Aguarda o próximo scan, atendendo comandos de escrita assim que chegam
+            proximo_scan = start_time + self._intervalo_efetivo(time.monotonic() - start_time)
+            while self.running:
+                sleep_time = proximo_scan - time.monotonic()
+                if sleep_time <= 0:
+                    break
+                if self.write_queue.aguardar_item(timeout=sleep_time):
+                    self._process_write_queue()
                 
         if self.client and self.client.is_open:
-            self.client.close()        
\ No newline at end of file
+            self.client.close()        
+
+
+class ModbusDriverGroupProcess(Process):
+    """
+    Executa vários drivers Modbus TCP em um único processo, um thread por driver.
+
+    Alternativa a um processo por driver quando há muitos CLPs: cada driver mantém o mesmo
+    ciclo de `ModbusDriverProcess.run` (o I/O de socket do pyModbusTCP libera o GIL), mas o
+    interpretador, os módulos e a memória base são compartilhados por todos.
+    """
+    def __init__(self, drivers, shared_data):
+        super().__init__()
+        self.daemon = True
+        # [(driver_config, tags_config, write_queue)]
+        self.drivers = drivers
+        self.shared_data = shared_data
+        self.source_name = f"Drivers-Modbus({len(drivers)})"
+
+    def run(self):
+        threads = []
+        for driver_config, tags_config, write_queue in self.drivers:
+            driver = ModbusDriverProcess(driver_config, tags_config, self.shared_data, write_queue)
+            thread = threading.Thread(target=driver.run, name=driver.source_name, daemon=True)
+            thread.start()
+            threads.append(thread)
+        log('INFO', self.source_name, f"{len(threads)} drivers Modbus em execução neste processo.")
+        for thread in threads:
+            thread.join()
@@ -24,7 +24,7 @@ Principais Características:
 Limitações:
 - Requer broker MQTT acessível e corretamente configurado para aceitar conexões externas.
 - Permissões de publicação/assinatura devem estar habilitadas para o usuário configurado.
-- Não executa parsing automático de payloads complexos (ex: JSON aninhado), podendo ser necessário tratamento adicional.
+- Apenas payloads JSON (objetos/listas) são decodificados automaticamente; outros formatos estruturados (XML, binário) chegam como texto.
 - Não realiza discovery automático de tópicos; depende da configuração das tags/tópicos monitorados.
 - A qualidade dos dados depende da frequência de publicação dos dispositivos nos tópicos MQTT.
 - Para garantir integridade dos dados, recomenda-se uso de QoS apropriado e tópicos bem definidos.
@@ -36,6 +36,10 @@ Referência Técnica:
 
 """
 
+import json
+import re
+import socket
+import threading
 import time
 from datetime import datetime
 from multiprocessing import Process, Lock, Queue
@@ -43,6 +47,33 @@ import paho.mqtt.client as mqtt
 
 from modulos.logger import log
 
+# orjson é opcional: decodifica JSON em C, bem mais rápido que o módulo json padrão
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# fastnumbers é opcional: converte texto em int/float em C, sem exceção em payloads não numéricos
+try:
+    from fastnumbers import fast_real
+except ImportError:
+    fast_real = None
+
+# Payloads numéricos: inteiros ("12", "-3") e reais com ponto ou vírgula decimal ("1.5", "2,75", "1e3")
+_RE_INTEIRO = re.compile(r'[-+]?\d+')
+_RE_REAL = re.compile(r'[-+]?(?:\d+[.,]?\d*|[.,]\d+)(?:[eE][-+]?\d+)?')
+
+# Espaços nas pontas do payload que exigem strip()
+_ESPACOS = b' \t\r\n'
+
+# Tópicos por pacote SUBSCRIBE (mantém cada pacote bem abaixo do limite de tamanho dos brokers)
+_TOPICOS_POR_SUBSCRIBE = 1000
+
+# Registro de payload vazio, compartilhado entre mensagens (`_update_shared_tags` apenas o lê)
+_DADOS_VALOR_VAZIO = {"valor": None, "qualidade": "ruim", "log": "Valor vazio recebido"}
+
 class MQTTDriverProcess(Process):
     """
     Processo autônomo e robusto para integração industrial via MQTT.
@@ -72,24 +103,54 @@ class MQTTDriverProcess(Process):
         self.timeout_s = config.get('timeout', 5000) / 1000.0
         self.retry_count = config.get('retry_count', 3)
         self.log_enabled = config.get('log_enabled', True)
+        # Fatia máxima de espera na rede entre verificações da fila de escrita
+        self.write_poll_interval_s = config.get('write_poll_interval', 10) / 1000.0
+        # Janela de PUBLISH QoS>0 sem confirmação (padrão do paho: 20) e fila de saída do cliente
+        self.max_inflight_messages = config.get('max_inflight_messages', 1000)
+        self.max_queued_messages = config.get('max_queued_messages', 100000)
         # --- Lista de tópicos monitorados vem das tags scan_enabled ---
-        self.topicos = [tag.get('endereco') for tag in self.tags_config if tag.get('scan_enabled', True)]
+        # (sem duplicados nem tags sem endereço, para caberem em SUBSCRIBE agrupados)
+        self.topicos = list(dict.fromkeys(
+            tag['endereco'] for tag in self.tags_config if tag.get('scan_enabled', True) and tag.get('endereco')))
         self.running = False
 
+        # --- Índices das tags calculados uma única vez (busca O(1) por id e por tópico) ---
+        self._tags_by_id = {}
+        self._tags_by_endereco = {}
+        for tag in self.tags_config:
+            # setdefault mantém a primeira tag em caso de ids/tópicos repetidos
+            self._tags_by_id.setdefault(tag['id'], tag)
+            if tag.get('endereco'):
+                self._tags_by_endereco.setdefault(tag['endereco'], tag)
+        # Ids de todas as tags, base do lote de qualidade ruim em `_mark_all_tags_bad`
+        self._tag_ids = tuple(self._tags_by_id)
+
         # --- Controle interno de reconexão e logging ---
         self.ultimo_status_conexao = None
+        self._rc_connack = None  # código do último CONNACK (None: ainda não recebido)
         self.ultimo_erro_log = 0
         self.log_interval_seconds = 30
 
+        # --- Timestamp formatado, refeito no máximo uma vez por segundo ---
+        self._ts_segundo = None
+        self._ts_texto = ""
+
     def run(self):
         """
         Método principal do processo: gerencia ciclo de vida, reconexão, loop de comunicação.
         """
         self.running = True
+        # --- Valores recebidos aguardando publicação no dicionário compartilhado ---
+        self._pending_updates = {}
+        # --- Cópia local do estado publicado (este processo é o único escritor do seu registro) ---
+        self._local_snapshot = dict(self.shared_data.get(self.driver_id, {}))
+        self._local_snapshot.setdefault("tags", {})
         # --- Estado MQTT ---
         self.client = mqtt.Client(client_id=self.client_id)
         if self.username and self.password:
             self.client.username_pw_set(self.username, self.password)
+        self.client.max_inflight_messages_set(self.max_inflight_messages)
+        self.client.max_queued_messages_set(self.max_queued_messages)
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
         self.client.on_disconnect = self.on_disconnect
@@ -113,20 +174,36 @@ class MQTTDriverProcess(Process):
             while not conectado and tentativas_de_conexao < self.retry_count and self.running:
                 try:
                     # --- Tentativa de conexão MQTT ---
+                    self._rc_connack = None
                     self.client.connect(self.broker_address, self.port, int(self.timeout_s))
-                    self.client.loop_start()  # Inicia thread interna do MQTT
+                    # --- Aguarda o CONNACK processando a rede nesta mesma thread ---
+                    # Um CONNACK recusado faz o paho fechar o socket: loop() passa a retornar erro
+                    # imediatamente, então a espera termina em vez de girar até o limite.
+                    limite_connack = time.monotonic() + 2
+                    while self.running and not self.client.is_connected() and time.monotonic() < limite_connack:
+                        if self.client.loop(timeout=0.1) != mqtt.MQTT_ERR_SUCCESS:
+                            break
+                    if not self.running:
+                        break
+                    if not self.client.is_connected():
+                        # Conta como tentativa falha (tags ruins, pausa) no tratamento abaixo
+                        motivo = "CONNACK não recebido" if self._rc_connack is None else f"conexão recusada pelo broker (código {self._rc_connack})"
+                        raise ConnectionError(motivo)
                     conectado = True
                     if self.log_enabled and self.ultimo_status_conexao != 'conectado':
                         log('INFO', self.source_name, "Conexão MQTT estabelecida com sucesso.")
                     self._update_shared_status("conectado", "Monitorando MQTT...")
                     self.ultimo_status_conexao = 'conectado'
-                    # --- Aguarda conexão antes de iniciar o loop principal ---
-                    time.sleep(2)
                     self._communication_loop()
                     # Após o loop, assume desconexão
                     conectado = False
 
                 except Exception as e:
+                    # Libera o socket de uma tentativa que não chegou a conectar
+                    try:
+                        self.client.disconnect()
+                    except Exception:
+                        pass
                     tentativas_de_conexao += 1
                     detalhe_erro = f"Falha ao conectar MQTT (tentativa {tentativas_de_conexao}/{self.retry_count}): {e}"
                     now = time.time()
@@ -151,18 +228,43 @@ class MQTTDriverProcess(Process):
         Callback padrão do MQTT: executado ao conectar ao broker.
         Inscreve-se nos tópicos das tags e registra eventos.
         """
+        self._rc_connack = rc
         if rc == 0:
             if self.log_enabled: log('INFO', self.source_name, "Conexão MQTT bem-sucedida.")
-            # --- Inscrição em todos os tópicos das tags com scan_enabled ---
-            for topico in self.topicos:
+            self._configurar_socket(client)
+            # --- Inscrição nos tópicos das tags com scan_enabled, vários tópicos por SUBSCRIBE ---
+            inscritos = 0
+            for inicio in range(0, len(self.topicos), _TOPICOS_POR_SUBSCRIBE):
+                lote = self.topicos[inicio:inicio + _TOPICOS_POR_SUBSCRIBE]
                 try:
-                    client.subscribe(topico)
-                    if self.log_enabled: log('INFO', self.source_name, f"Inscrito no tópico: {topico}")
+                    rc, _ = client.subscribe([(topico, 0) for topico in lote])
+                    if rc == mqtt.MQTT_ERR_SUCCESS:
+                        inscritos += len(lote)
+                    elif self.log_enabled:
+                        log('ERROR', self.source_name, f"Falha ao inscrever {len(lote)} tópicos (a partir de '{lote[0]}'). Código: {rc}")
                 except Exception as e:
-                    if self.log_enabled: log('ERROR', self.source_name, f"Erro ao inscrever no tópico '{topico}': {e}")
+                    if self.log_enabled: log('ERROR', self.source_name, f"Erro ao inscrever {len(lote)} tópicos (a partir de '{lote[0]}'): {e}")
+            if self.log_enabled: log('INFO', self.source_name, f"Inscrito em {inscritos} de {len(self.topicos)} tópicos.")
         else:
             if self.log_enabled: log('ERROR', self.source_name, f"Falha na conexão MQTT. Código: {rc}")
 
+    def _configurar_socket(self, client):
+        """
+        Desativa o algoritmo de Nagle (PUBLISH pequenos esperariam ~40 ms por ACKs) e amplia os
+        buffers do socket. Chamado a cada conexão, pois o paho cria um socket novo ao reconectar.
+        """
+        sock = client.socket()
+        if not isinstance(sock, socket.socket):
+            # Transportes como WebSockets não expõem o socket TCP
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 256 * 1024)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 256 * 1024)
+        except OSError as e:
+            if self.log_enabled:
+                log('WARN', self.source_name, f"Não foi possível ajustar as opções do socket MQTT: {e}")
+
     def on_disconnect(self, client, userdata, rc):
         """
         Callback padrão do MQTT: executado ao desconectar do broker.
@@ -176,50 +278,76 @@ class MQTTDriverProcess(Process):
     def on_message(self, client, userdata, msg):
         """
         Callback padrão do MQTT: executado ao receber mensagem de qualquer tópico inscrito.
+        Não há try/except por mensagem: a conversão em `_process_message` não lança exceções.
         """
-        try:
-            topic = msg.topic
-            payload = msg.payload.decode('utf-8')
-            self._process_message(topic, payload)
-        except Exception as e:
-            if self.log_enabled:
-                log('ERROR', self.source_name, f"Erro ao processar mensagem MQTT: {e}")
+        self._process_message(msg.topic, msg.payload)
 
-    def _process_message(self, topic, valor):
+    def _process_message(self, topic, payload: bytes):
         """
-        Processa mensagem recebida, converte valor, atualiza o dicionário compartilhado.
+        Converte o payload recebido e o registra em `_pending_updates`. Executado dentro de
+        `client.loop`; a publicação é feita uma vez por ciclo por `_flush_pending_updates`
+        (prevalece a última mensagem de cada tópico).
         """
-        try:
-            valor = valor.strip() if isinstance(valor, str) else valor
-            if valor == "": valor = None
-            elif isinstance(valor, str) and valor.isdigit():
-                valor = int(valor)
-            else:
-                try:
-                    valor = float(valor.replace(",", ".")) if isinstance(valor, str) else valor
-                except Exception:
-                    pass
-
-            dados_lidos = {
-                topic: {
-                    "valor": valor,
-                    "qualidade": "boa" if valor is not None else "ruim",
-                    "log": "Mensagem recebida MQTT" if valor is not None else "Valor vazio recebido"
-                }
-            }
-            self._update_shared_tags(dados_lidos)
-        except Exception as e:
-            if self.log_enabled:
-                log('ERROR', self.source_name, f"Erro ao processar tag MQTT '{topic}': {e}")
+        # Caso mais comum (inteiro sem sinal): bytes.isdigit verifica só ASCII 0-9 em C e int()
+        # aceita os bytes diretamente, sem decodificar nem passar pelas expressões regulares
+        if payload.isdigit():
+            self._pending_updates[topic] = {"valor": int(payload), "qualidade": "boa", "log": "Mensagem recebida MQTT"}
+            return
+
+        # UTF-8 inválido vira caractere de substituição; strip só quando há espaço nas pontas
+        valor = payload.decode('utf-8', 'replace')
+        if payload[:1] in _ESPACOS or payload[-1:] in _ESPACOS:
+            valor = valor.strip()
+        if not valor:
+            self._pending_updates[topic] = _DADOS_VALOR_VAZIO
+            return
+
+        if valor[0] in '{[':
+            # Objetos/listas JSON são entregues já decodificados; JSON inválido permanece como texto
+            try:
+                valor = _json_loads(valor)
+            except ValueError:
+                pass
+        elif fast_real is not None:
+            # Em caso de falha o fast_real devolve o próprio texto; "nan"/"inf" permanecem como texto
+            convertido = fast_real(valor.replace(",", ".") if "," in valor else valor,
+                                   coerce=False, nan=valor, inf=valor)
+            if not isinstance(convertido, str):
+                valor = convertido
+        elif _RE_INTEIRO.fullmatch(valor):
+            valor = int(valor)
+        elif _RE_REAL.fullmatch(valor):
+            valor = float(valor.replace(",", "."))
+        # Demais payloads permanecem como texto, sem passar pelo float() nem lançar exceção
+
+        self._pending_updates[topic] = {"valor": valor, "qualidade": "boa", "log": "Mensagem recebida MQTT"}
 
     def _process_write_queue(self):
         """
-        Processa comandos de escrita na fila, publica valores nos tópicos correspondentes.
+        Drena a fila de escrita e publica os valores nos tópicos correspondentes em sequência,
+        permitindo que o paho agrupe os PUBLISH em menos segmentos TCP. O log é feito uma vez por lote.
         """
-        while not self.write_queue.empty():
+        try:
+            # Todos os comandos pendentes em uma única passada pelo buffer circular
+            pendentes = self.write_queue.get_many_nowait()
+        except Exception as e:
+            if self.log_enabled:
+                log('ERROR', self.source_name, f"Exceção na escrita MQTT: {e}")
+            return
+        if not pendentes:
+            return
+
+        publicados = []  # (topico, valor, rc)
+        for item in pendentes:
+            # Escritas em lote (dict) e itens malformados não se aplicam ao MQTT: não podem
+            # derrubar o loop de comunicação nem descartar o restante do lote
+            if not (isinstance(item, tuple) and len(item) == 2):
+                if self.log_enabled:
+                    log('WARN', self.source_name, f"Item inválido na fila de escrita MQTT: {item}")
+                continue
             try:
-                tag_id, valor_para_escrever = self.write_queue.get_nowait()
-                tag_config = next((t for t in self.tags_config if t['id'] == tag_id), None)
+                tag_id, valor_para_escrever = item
+                tag_config = self._tags_by_id.get(tag_id)
                 if not tag_config or not tag_config.get('escrita_permitida'):
                     if self.log_enabled:
                         log('WARN', self.source_name, f"Escrita ignorada para tag '{tag_id}' (não encontrada ou sem permissão).")
@@ -227,8 +355,7 @@ class MQTTDriverProcess(Process):
                 topico = tag_config.get('endereco')
                 if topico:
                     result = self.client.publish(topico, valor_para_escrever)
-                    if self.log_enabled:
-                        log('INFO', self.source_name, f"Mensagem publicada no tópico '{topico}': {valor_para_escrever} (result: {result.rc})")
+                    publicados.append((topico, valor_para_escrever, result.rc))
                 else:
                     if self.log_enabled:
                         log('WARN', self.source_name, f"Comando de escrita para tag desconhecida '{tag_id}' ignorado.")
@@ -236,38 +363,54 @@ class MQTTDriverProcess(Process):
                 if self.log_enabled:
                     log('ERROR', self.source_name, f"Exceção na escrita MQTT: {e}")
 
+        if publicados and self.log_enabled:
+            if len(publicados) == 1:
+                topico, valor, rc = publicados[0]
+                log('INFO', self.source_name, f"Mensagem publicada no tópico '{topico}': {valor} (result: {rc})")
+            else:
+                resumo = ", ".join(f"'{topico}'={valor} (rc {rc})" for topico, valor, rc in publicados)
+                log('INFO', self.source_name, f"{len(publicados)} mensagens publicadas: {resumo}")
+
+
+    def _timestamp(self) -> str:
+        """
+        Retorna o timestamp atual formatado ("%d/%m/%Y %H:%M:%S"). Como a resolução é de
+        1 segundo, o strftime só é refeito quando o segundo muda.
+        """
+        segundo = int(time.time())
+        if segundo != self._ts_segundo:
+            self._ts_segundo = segundo
+            self._ts_texto = datetime.fromtimestamp(segundo).strftime("%d/%m/%Y %H:%M:%S")
+        return self._ts_texto
 
     def _update_shared_status(self, status: str, detalhe: str):
         """
-        Atualiza o status geral do driver no dicionário compartilhado do sistema.
+        Atualiza o status geral do driver no registro local e o publica no dicionário compartilhado.
         """
         try:
-            driver_data = self.shared_data.get(self.driver_id, {})
-            driver_data.update({
+            self._local_snapshot.update({
                 "status_conexao": status,
                 "detalhe": detalhe,
-                "timestamp": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+                "timestamp": self._timestamp(),
                 "config": self.driver_config,
-                "tags": driver_data.get("tags", {}),
                 "log": detalhe
             })
-            self.shared_data[self.driver_id] = driver_data
+            self.shared_data[self.driver_id] = self._local_snapshot
         except Exception as e:
             if self.log_enabled:
                 log('ERROR', self.source_name, f"Falha ao atualizar status compartilhado: {e}")
 
     def _update_shared_tags(self, dados_lidos: dict):
         """
-        Atualiza os dados das tags no dicionário compartilhado, seguindo padrão completo do sistema.
+        Atualiza os dados das tags no registro local e o publica com uma única atribuição,
+        sem reler o estado compartilhado a cada lote.
         """
         try:
-            driver_data = self.shared_data.get(self.driver_id)
-            if not driver_data:
-                driver_data = {}
-            tags_data = driver_data.get("tags", {})
+            tags_data = self._local_snapshot["tags"]
+            timestamp = self._timestamp()  # um único timestamp para todo o lote
             for tag_id, data in dados_lidos.items():
                 # Busca config real da tag (por id ou endereco/tópico)
-                tag_config = next((t for t in self.tags_config if t.get('endereco') == tag_id or t['id'] == tag_id), {})
+                tag_config = self._tags_by_endereco.get(tag_id) or self._tags_by_id.get(tag_id) or {}
                 tag_status = {
                     "id": tag_config.get('id', tag_id),
                     "id_driver": self.driver_id,
@@ -276,48 +419,78 @@ class MQTTDriverProcess(Process):
                     "tipo_dado": tag_config.get('tipo_dado', '--'),
                     "valor": data.get('valor'),
                     "qualidade": data.get('qualidade'),
-                    "timestamp": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+                    "timestamp": timestamp,
                     "log": data.get('log', '')
                 }
                 # Propaga campo_exibir se existir (para interface)
                 if 'campo_exibir' in tag_config:
                     tag_status['campo_exibir'] = tag_config['campo_exibir']
                 tags_data[tag_status['id']] = tag_status
-            driver_data["tags"] = tags_data
-            self.shared_data[self.driver_id] = driver_data
+            self.shared_data[self.driver_id] = self._local_snapshot
         except Exception as e:
             if self.log_enabled:
                 log('ERROR', self.source_name, f"Falha ao atualizar tags compartilhadas: {e}")
 
+    def _flush_pending_updates(self):
+        """
+        Troca o lote de mensagens pendentes por um dicionário novo e o publica de uma vez,
+        com uma única escrita no dicionário compartilhado por ciclo.
+        """
+        if not self._pending_updates:
+            return
+        lote, self._pending_updates = self._pending_updates, {}
+        self._update_shared_tags(lote)
+
     def _mark_all_tags_bad(self, log_msg: str):
         """
         Marca todas as tags como de qualidade ruim em caso de desconexão do broker.
+        Descarta as mensagens pendentes, para que não sobrescrevam a qualidade ruim.
         """
-        dados_ruins = {
-            tag_config['id']: {"valor": None, "qualidade": "ruim", "log": log_msg}
-            for tag_config in self.tags_config
-        }
+        self._pending_updates = {}
+        # Um único dicionário compartilhado por todas as tags: `_update_shared_tags` apenas o lê
+        dados_ruins = dict.fromkeys(self._tag_ids, {"valor": None, "qualidade": "ruim", "log": log_msg})
         self._update_shared_tags(dados_ruins)
 
     def _communication_loop(self):
         """
-        Loop principal de comunicação: processa fila de escrita e mantém ciclo de vida do driver.
+        Loop principal de comunicação: publica as mensagens recebidas a cada scan e atende
+        os comandos de escrita assim que chegam, sem esperar o fim do intervalo.
+
+        A rede MQTT é processada aqui mesmo via `client.loop` (sem a thread do `loop_start`):
+        callbacks, keepalive e PUBLISH rodam todos na thread do driver, sem disputa de GIL.
         """
-        while self.running and self.client.is_connected():
-            start_time = time.time()
+        # Métodos e parâmetros usados a cada fatia vinculados a locais (LOAD_FAST em vez de LOAD_ATTR)
+        client_loop = self.client.loop
+        is_connected = self.client.is_connected
+        processar_escritas = self._process_write_queue
+        flush_pendentes = self._flush_pending_updates
+        monotonic = time.monotonic
+        scan_interval_s = self.scan_interval_s
+        fatia_s = self.write_poll_interval_s
+        sucesso = mqtt.MQTT_ERR_SUCCESS
+
+        while self.running and is_connected():
+            start_time = monotonic()
             try:
-                self._process_write_queue()
+                flush_pendentes()
+                processar_escritas()
             except Exception as e:
                 if self.log_enabled:
                     log('ERROR', self.source_name, f"Erro durante comunicação MQTT: {e}. Forçando reconexão...")
                 break
-            elapsed = time.time() - start_time
-            sleep_time = self.scan_interval_s - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+
+            # Até o próximo scan: processa a rede em fatias curtas, atendendo a fila de escrita entre elas
+            proximo_scan = start_time + scan_interval_s
+            while self.running:
+                sleep_time = proximo_scan - monotonic()
+                if sleep_time <= 0:
+                    break
+                if client_loop(timeout=sleep_time if sleep_time < fatia_s else fatia_s) != sucesso:
+                    break
+                # Sem empty() antes: get_many_nowait já lê os contadores uma única vez e devolve [] se vazia
+                processar_escritas()
         # --- Finalização segura da conexão MQTT ---
         try:
-            self.client.loop_stop()
             self.client.disconnect()
         except Exception:
             pass
@@ -328,10 +501,37 @@ class MQTTDriverProcess(Process):
         """
         self.running = False
         try:
-            self.client.loop_stop()
             self.client.disconnect()
             if self.log_enabled:
                 log('INFO', self.source_name, "Conexão MQTT encerrada.")
         except Exception as e:
             if self.log_enabled:
-                log('ERROR', self.source_name, f"Falha ao encerrar conexão MQTT: {e}")
\ No newline at end of file
+                log('ERROR', self.source_name, f"Falha ao encerrar conexão MQTT: {e}")
+
+
+class MQTTDriverGroupProcess(Process):
+    """
+    Executa vários drivers MQTT em um único processo, um thread por driver.
+
+    Cada driver mantém o próprio cliente paho e o mesmo ciclo de `MQTTDriverProcess.run`;
+    as esperas de rede (`client.loop`) liberam o GIL, então os drivers não se bloqueiam. Evita
+    um processo (interpretador, módulos, memória base) por broker quando há muitos drivers MQTT.
+    """
+    def __init__(self, drivers, shared_data):
+        super().__init__()
+        self.daemon = True
+        # [(driver_config, tags_config, write_queue)]
+        self.drivers = drivers
+        self.shared_data = shared_data
+        self.source_name = f"Drivers-MQTT({len(drivers)})"
+
+    def run(self):
+        threads = []
+        for driver_config, tags_config, write_queue in self.drivers:
+            driver = MQTTDriverProcess(driver_config, tags_config, self.shared_data, write_queue)
+            thread = threading.Thread(target=driver.run, name=driver.source_name, daemon=True)
+            thread.start()
+            threads.append(thread)
+        log('INFO', self.source_name, f"{len(threads)} drivers MQTT em execução neste processo.")
+        for thread in threads:
+            thread.join()
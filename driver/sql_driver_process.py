@@ -41,13 +41,62 @@ Referência Técnica:
 
 
 import time
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from multiprocessing import Process
 import threading
 import pyodbc
 
 from modulos.logger import log
 
+# Delimitadores de identificadores (tabela/colunas) por banco. Colchetes só são aceitos por
+# SQL Server, Sybase, Access e SQLite; os demais usam o padrão ANSI (aspas duplas) ou crases.
+_ASPAS_IDENTIFICADOR = {
+    'sqlserver': ('[', ']'),
+    'sybase': ('[', ']'),
+    'access': ('[', ']'),
+    'mysql': ('`', '`'),
+    'postgresql': ('"', '"'),
+    'oracle': ('"', '"'),
+    'sqlite': ('"', '"'),
+    'firebird': ('"', '"'),
+    'db2': ('"', '"'),
+}
+
+# Consulta (parâmetros: tabela, coluna) que retorna 1 quando a coluna é gerada pelo servidor
+# (IDENTITY/AUTO_INCREMENT/SERIAL). SQLite usa PRAGMA table_info; nos demais bancos a coluna é
+# tratada como comum e preenchida com MAX+1.
+_SQL_COLUNA_AUTOMATICA = {
+    'sqlserver': "SELECT COLUMNPROPERTY(OBJECT_ID(?), ?, 'IsIdentity')",
+    'mysql': ("SELECT CASE WHEN EXTRA LIKE '%auto_increment%' THEN 1 ELSE 0 END FROM INFORMATION_SCHEMA.COLUMNS "
+              "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND COLUMN_NAME = ?"),
+    'postgresql': ("SELECT CASE WHEN is_identity = 'YES' OR column_default LIKE 'nextval(%' THEN 1 ELSE 0 END "
+                   "FROM information_schema.columns WHERE table_name = ? AND column_name = ?"),
+}
+
+def _tamanho_parametro(desc):
+    """
+    Tipo ODBC (sqltype, tamanho, decimais) para `setinputsizes` a partir de uma entrada de
+    cursor.description, ou None quando o tipo não tem mapeamento seguro (o pyodbc então infere).
+    """
+    _, tipo, _, tamanho, precisao, escala, _ = desc
+    if tipo is bool:
+        return (pyodbc.SQL_BIT, 0, 0)
+    if tipo is int:
+        return (pyodbc.SQL_BIGINT, 0, 0)
+    if tipo is float:
+        return (pyodbc.SQL_DOUBLE, 0, 0)
+    if tipo is Decimal and precisao:
+        return (pyodbc.SQL_DECIMAL, precisao, escala or 0)
+    if tipo is datetime:
+        escala = escala or 0
+        return (pyodbc.SQL_TYPE_TIMESTAMP, 20 + escala if escala else 19, escala)
+    if tipo is date:
+        return (pyodbc.SQL_TYPE_DATE, 10, 0)
+    if tipo is str and tamanho and 0 < tamanho <= 4000:
+        return (pyodbc.SQL_WVARCHAR, tamanho, 0)
+    return None
+
 class SQLDriverProcess(Process):
     """
     Driver SQL industrial genérico, monta a string de conexão conforme o tipo de banco informado em 'db_type'.
@@ -75,13 +124,81 @@ class SQLDriverProcess(Process):
         self.retry_count = config.get('retry_count', 3)
         self.log_enabled = config.get('log_enabled', True)
         self.table_name = config.get('table_name', 'dados_processo')
+        # Arrays de parâmetros ODBC no executemany (um único round-trip por lote); suporte garantido
+        # no driver do SQL Server, opcional nos demais. Com ele ativo, os tipos dos parâmetros vêm
+        # do esquema via setinputsizes
+        self.fast_executemany = config.get('fast_executemany', self.db_type == 'sqlserver')
+        # Consulta antes o MAX da coluna de ordenação e só relê a linha quando ele muda. Desligado
+        # por padrão: um UPDATE externo na linha mais recente (ex.: tabela de valores atuais com
+        # uma linha) não muda o MAX. Mesmo ligado, a leitura completa é forçada a cada
+        # `full_read_every` scans para que essas alterações apareçam
+        self.skip_unchanged_scan = config.get('skip_unchanged_scan', False)
+        self.full_read_every = max(1, int(config.get('full_read_every', 10)))
+        # Intervalo mínimo entre publicações das tags no dicionário compartilhado (status é imediato)
+        self.publish_interval_s = config.get('publish_interval', 500) / 1000.0
+        # Conexões por processo: com 2 (padrão em bancos servidor), leitura e escrita usam conexões
+        # próprias e a drenagem da fila roda em uma thread, sem bloquear o scan; com 1, compartilham
+        # a conexão. Bancos em arquivo (SQLite, Access) travam o arquivo inteiro: uma leitura
+        # concorrente faria o commit da escrita falhar ("database is locked"), então o padrão é 1
+        pool_padrao = 1 if self.db_type in ('sqlite', 'access') else 2
+        self.pool_size = max(1, min(int(config.get('pool_size', pool_padrao)), 2))
         self.running = False
-        self.conn = None
+        self._read_conn = None
+        self._write_conn = None
+        # Colunas/tipos da tabela, lidos uma vez por conexão (ver _load_schema)
+        self._schema_cache = None
+        # Tags lidas a cada scan e índices calculados uma única vez (busca O(1) por id)
+        self._enabled_tags = [tag for tag in self.tags_config if tag.get('scan_enabled', True)]
+        self._tags_by_id = {}
+        for tag in self.tags_config:
+            # setdefault mantém a primeira tag em caso de ids repetidos, como a busca linear anterior
+            self._tags_by_id.setdefault(tag['id'], tag)
+        self._enderecos_tags = {tag.get('endereco') for tag in self.tags_config}
+        # Cursor persistente das escritas e INSERTs já montados, por conjunto de colunas
+        self._write_cursor = None
+        self._insert_sql_cache = {}
+        # Tipos dos parâmetros de cada comando montado (setinputsizes); refeito a cada esquema
+        self._tipos_por_sql = {}
+        self._ultimo_incremental = None
+        # Último MAX(coluna de ordenação) lido; None força a leitura completa no próximo scan.
+        # A geração é incrementada a cada drenagem gravada e também força a releitura
+        self._last_order_val = None
+        self._geracao_escrita = 0
+        self._geracao_lida = 0
+        self._scans_sem_leitura = 0
+        # Evitam reescrever todas as tags como ruins a cada nova tentativa/scan com a mesma falha
+        self._all_bad_marked = False
+        self._ultimo_erro_leitura = None
     # self.lock será inicializado no método run()
         self.ultimo_status_conexao = None
         self.ultimo_erro_log = 0
         self.log_interval_seconds = 30
 
+        # --- String de conexão e validação montadas uma única vez ---
+        self._conn_str = None
+        self._config_error = None
+        try:
+            self._conn_str = self._montar_conn_str()
+        except Exception as e:
+            self._config_error = f"Erro ao montar string de conexão: {e}"
+        else:
+            # Testa campos obrigatórios (os campos mudam por banco, mas os principais são validados)
+            if not all([self.host, self.database, self.username, self.password]) and self.db_type not in ["sqlite", "access"]:
+                self._config_error = f"Configuração SQL inválida: host/database/user/password obrigatórios. >> String: {self._conn_str}"
+
+        # --- Identificadores delimitados conforme o dialeto ---
+        self._aspas = _ASPAS_IDENTIFICADOR.get(self.db_type, ('[', ']'))
+        self._tabela_sql = self._q(self.table_name)
+
+        # --- Fragmentos de "apenas a primeira linha" conforme o dialeto ---
+        self._select_top = "TOP 1 " if self.db_type == "sqlserver" else ""
+        self._limit_1 = " LIMIT 1" if self.db_type in ["mysql", "postgresql", "sqlite", "firebird", "db2", "sybase"] else ""
+
+    def _q(self, identificador):
+        """Delimita um nome de tabela/coluna com as aspas do banco configurado."""
+        abre, fecha = self._aspas
+        return f"{abre}{identificador}{fecha}"
+
     def _montar_conn_str(self):
         """
         Monta a string de conexão ODBC conforme o tipo de banco.
@@ -171,24 +288,22 @@ class SQLDriverProcess(Process):
     def run(self):
         self.lock = threading.Lock()  # Inicializa o lock aqui, seguro para multiprocessing
         self.running = True
+        # Registro local do driver: as atualizações são aplicadas aqui e publicadas com uma única
+        # atribuição, no máximo a cada publish_interval para as tags
+        self._local_snapshot = dict(self.shared_data.get(self.driver_id, {}))
+        self._local_snapshot.setdefault("tags", {})
+        self._last_publish = 0.0
+        self._publicacao_pendente = False
         if self.log_enabled:
             log('INFO', self.source_name, f"[{self.driver_config.get('tipo', 'sql')}] Processo iniciado.")
-        try:
-            conn_str = self._montar_conn_str()
-        except Exception as e:
-            detalhe_erro = f"Erro ao montar string de conexão: {e} >> String: {conn_str}"
+        # Configuração validada em __init__
+        if self._config_error:
+            detalhe_erro = self._config_error
             if self.log_enabled: log('ERROR', self.source_name, detalhe_erro)
             self._update_shared_status("desconectado", detalhe_erro)
             self._mark_all_tags_bad(detalhe_erro)
             return
-
-        # Testa campos obrigatórios (os campos mudam por banco, mas os principais são validados)
-        if not all([self.host, self.database, self.username, self.password]) and self.db_type not in ["sqlite", "access"]:
-            detalhe_erro = f"Configuração SQL inválida: host/database/user/password obrigatórios. >> String: {conn_str}"
-            if self.log_enabled: log('ERROR', self.source_name, detalhe_erro )
-            self._update_shared_status("desconectado", detalhe_erro)
-            self._mark_all_tags_bad(detalhe_erro)
-            return
+        conn_str = self._conn_str
 
         while self.running:
             tentativas_de_conexao = 0
@@ -196,8 +311,19 @@ class SQLDriverProcess(Process):
 
             while not conectado and tentativas_de_conexao < self.retry_count and self.running:
                 try:
-                    self.conn = pyodbc.connect(conn_str, timeout=int(self.scan_interval_s*2))
+                    self._schema_cache = None
+                    self._read_conn = pyodbc.connect(conn_str, timeout=int(self.scan_interval_s*2))
+                    self._load_schema()
+                    if self.pool_size > 1:
+                        self._write_conn = pyodbc.connect(conn_str, timeout=int(self.scan_interval_s*2))
+                    else:
+                        self._write_conn = self._read_conn
+                    self._write_cursor = self._write_conn.cursor()
+                    if self.fast_executemany:
+                        self._write_cursor.fast_executemany = True
                     conectado = True
+                    self._all_bad_marked = False
+                    self._ultimo_erro_leitura = None
                     if self.log_enabled and self.ultimo_status_conexao != 'conectado':
                         log('INFO', self.source_name, "Conexão SQL estabelecida com sucesso.")
                     self._update_shared_status("conectado", "Monitorando SQL...")
@@ -205,6 +331,8 @@ class SQLDriverProcess(Process):
                     self._communication_loop()
                     conectado = False
                 except Exception as e:
+                    # Conexões abertas antes da falha (ex.: tabela inexistente) não podem ficar penduradas
+                    self._fechar_conexoes()
                     tentativas_de_conexao += 1
                     detalhe_erro = f"Falha ao conectar SQL (tentativa {tentativas_de_conexao}/{self.retry_count}): {e} >> String: {conn_str}"
                     now = time.time()
@@ -223,212 +351,425 @@ class SQLDriverProcess(Process):
                 time.sleep(10)
 
     def _communication_loop(self):
-        while self.running and self.conn:
-            start_time = time.time()
+        if self.pool_size > 1:
+            self._communication_loop_paralelo()
+        else:
+            self._communication_loop_unico()
+        self._maybe_publish(forcar=True)
+        # Cursor e conexões são recriados juntos na próxima conexão
+        self._write_cursor = None
+        self._fechar_conexoes()
+
+    def _communication_loop_unico(self):
+        """Leitura e escrita alternadas na mesma conexão (pool_size = 1)."""
+        while self.running:
+            start_time = time.monotonic()
             try:
                 self._read_all_tags()
+                self._maybe_publish()
                 self._process_write_queue()
+
+                # Aguarda o próximo scan, gravando os comandos de escrita assim que chegam
+                proximo_scan = start_time + self.scan_interval_s
+                while self.running:
+                    sleep_time = proximo_scan - time.monotonic()
+                    if sleep_time <= 0:
+                        break
+                    if self.write_queue.aguardar_item(timeout=sleep_time):
+                        self._process_write_queue()
             except Exception as e:
                 if self.log_enabled:
                     log('ERROR', self.source_name, f"Erro durante comunicação SQL: {e}. Forçando reconexão...")
                 break
-            elapsed = time.time() - start_time
-            sleep_time = self.scan_interval_s - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+
+    def _communication_loop_paralelo(self):
+        """
+        Scan na conexão de leitura e drenagem da fila em uma thread com a conexão de escrita.
+        Uma falha em qualquer das duas sinaliza `falha` e encerra ambas; o run() reconecta as duas.
+        """
+        falha = threading.Event()
+        escritor = threading.Thread(target=self._write_loop, args=(falha,), daemon=True)
+        escritor.start()
         try:
-            self.conn.close()
-        except Exception:
-            pass
+            while self.running and not falha.is_set():
+                start_time = time.monotonic()
+                self._read_all_tags()
+                self._maybe_publish()
+                # Aguarda o próximo scan; acorda antes se a thread de escrita falhar
+                sleep_time = start_time + self.scan_interval_s - time.monotonic()
+                if sleep_time > 0:
+                    falha.wait(sleep_time)
+        except Exception as e:
+            if self.log_enabled:
+                log('ERROR', self.source_name, f"Erro durante leitura SQL: {e}. Forçando reconexão...")
+        finally:
+            falha.set()
+            escritor.join()
 
-    def _read_all_tags(self):
-        dados_lidos = {}
-        for tag in self.tags_config:
-            if not tag.get('scan_enabled', True):
+    def _write_loop(self, falha):
+        """Thread de escrita: grava os comandos assim que chegam na fila, até parada ou falha."""
+        try:
+            while self.running and not falha.is_set():
+                if self.write_queue.aguardar_item(timeout=0.5):
+                    self._process_write_queue()
+        except Exception as e:
+            if self.log_enabled:
+                log('ERROR', self.source_name, f"Erro durante escrita SQL: {e}. Forçando reconexão...")
+            falha.set()
+
+    def _fechar_conexoes(self):
+        conexoes = [self._read_conn]
+        if self._write_conn is not self._read_conn:
+            conexoes.append(self._write_conn)
+        for conn in conexoes:
+            if conn is None:
                 continue
-            coluna = tag.get('endereco')
-            tag_id = tag['id']
             try:
-                # Descobrir coluna para ordenação: 'timestamp' ou primeira coluna
-                cursor = self.conn.cursor()
-                cursor.execute(f"SELECT * FROM [{self.table_name}] LIMIT 1" if self.db_type != "sqlserver" else f"SELECT TOP 1 * FROM [{self.table_name}]")
-                columns = [desc[0] for desc in cursor.description]
-                # Preferencialmente usar 'timestamp', senão a primeira coluna
-                if 'timestamp' in columns:
-                    col_ord = 'timestamp'
-                else:
-                    col_ord = columns[0]
-                # Montar consulta limitada ao mais recente
-                if self.db_type == "sqlserver":
-                    query = f"SELECT TOP 1 * FROM [{self.table_name}] ORDER BY [{col_ord}] DESC"
-                elif self.db_type in ["mysql", "postgresql", "sqlite", "firebird", "db2", "sybase"]:
-                    query = f"SELECT * FROM [{self.table_name}] ORDER BY [{col_ord}] DESC LIMIT 1"
-                else:
-                    query = f"SELECT * FROM [{self.table_name}] ORDER BY [{col_ord}] DESC"
-                cursor.execute(query)
+                conn.close()
+            except Exception:
+                pass
+        self._read_conn = None
+        self._write_conn = None
+
+    def _load_schema(self):
+        """
+        Descobre colunas e tipos da tabela com uma única consulta por conexão. O esquema não muda
+        entre scans; o cache é descartado a cada reconexão (o loop de comunicação só termina com
+        erro ou parada), então alterações na tabela são vistas após reconectar.
+        """
+        cursor = self._read_conn.cursor()
+        cursor.execute(f"SELECT {self._select_top}* FROM {self._tabela_sql}{self._limit_1}")
+        columns = [desc[0] for desc in cursor.description]
+        col_types = [desc[1] for desc in cursor.description]
+        tipos_parametro = {desc[0]: _tamanho_parametro(desc) for desc in cursor.description}
+        # Preferencialmente ordenar por 'timestamp', senão pela primeira coluna
+        col_ord = 'timestamp' if 'timestamp' in columns else columns[0]
+        self._last_order_val = None
+
+        # Consulta única do scan: só as colunas das tags habilitadas (que existem na tabela), da linha mais recente
+        read_cols = list(dict.fromkeys(
+            tag.get('endereco') for tag in self._enabled_tags if tag.get('endereco') in columns))
+        colunas_sql = ', '.join(self._q(col) for col in read_cols)
+        sql_read_latest = f"SELECT {self._select_top}{colunas_sql} FROM {self._tabela_sql} ORDER BY {self._q(col_ord)} DESC{self._limit_1}"
+
+        self._tipos_por_sql = {}
+        self._schema_cache = {
+            'columns': columns,
+            'first_auto': self._coluna_automatica(cursor, columns[0]),
+            'col_types': col_types,
+            'tipos_parametro': tipos_parametro,
+            'first_col': columns[0],
+            'first_type': col_types[0],
+            'order_col': col_ord,
+            'read_cols': read_cols,
+            'sql_read_latest': sql_read_latest,
+            'sql_max_first': f"SELECT MAX({self._q(columns[0])}) FROM {self._tabela_sql}",
+            'sql_max_order': f"SELECT MAX({self._q(col_ord)}) FROM {self._tabela_sql}",
+        }
+
+    def _coluna_automatica(self, cursor, coluna):
+        """Indica se o próprio banco gera o valor da coluna; na dúvida (sem permissão, banco sem consulta) retorna False."""
+        try:
+            if self.db_type == 'sqlite':
+                cursor.execute(f"PRAGMA table_info({self._tabela_sql})")
+                chaves = [(nome, tipo) for _, nome, tipo, _, _, pk in cursor.fetchall() if pk]
+                # Só INTEGER PRIMARY KEY (única) é alias do rowid e recebe valor automático
+                return len(chaves) == 1 and chaves[0][0] == coluna and chaves[0][1].upper() == 'INTEGER'
+            consulta = _SQL_COLUNA_AUTOMATICA.get(self.db_type)
+            if consulta is None:
+                return False
+            cursor.execute(consulta, (self.table_name, coluna))
+            row = cursor.fetchone()
+            return bool(row and row[0])
+        except Exception as e:
+            if self.log_enabled:
+                log('WARN', self.source_name, f"Não foi possível verificar se a coluna '{coluna}' é automática: {e}")
+            return False
+
+    def _read_all_tags(self):
+        """
+        Lê a linha mais recente da tabela com uma única consulta por scan e distribui as colunas
+        entre as tags. Uma falha na consulta marca todas as tags do scan como ruins. Com
+        `skip_unchanged_scan`, um MAX escalar da coluna de ordenação decide antes se a linha
+        mais recente mudou; se não mudou, o scan não relê a linha e mantém os valores publicados
+        (exceto a cada `full_read_every` scans, que sempre leem a linha completa).
+        """
+        schema = self._schema_cache
+        row_dict = {}
+        try:
+            if schema['read_cols']:
+                cursor = self._read_conn.cursor()
+                if self.skip_unchanged_scan:
+                    geracao = self._geracao_escrita
+                    cursor.execute(schema['sql_max_order'])
+                    ultimo = cursor.fetchone()[0]
+                    if (ultimo is not None and ultimo == self._last_order_val and geracao == self._geracao_lida
+                            and self._scans_sem_leitura + 1 < self.full_read_every):
+                        self._scans_sem_leitura += 1
+                        return
+                    self._scans_sem_leitura = 0
+                cursor.execute(schema['sql_read_latest'])
                 row = cursor.fetchone()
-                valor = None
                 if row:
-                    # Analisar tipo da coluna de ordenação
-                    col_types = [desc[1] for desc in cursor.description]
-                    # Se for int ou datetime, ok
-                    row_dict = dict(zip(columns, row))
-                    valor = row_dict.get(coluna)
-                dados_lidos[tag_id] = {
-                    "valor": valor,
-                    "qualidade": "boa" if valor is not None else "ruim",
-                    "log": "OK" if valor is not None else "Sem dados"
-                }
-            except Exception as e:
-                dados_lidos[tag_id] = {
-                    "valor": None,
-                    "qualidade": "ruim",
-                    "log": f"Erro leitura SQL: {e}"
-                }
+                    row_dict = dict(zip(schema['read_cols'], row))
+                if self.skip_unchanged_scan:
+                    self._last_order_val = ultimo
+                    self._geracao_lida = geracao
+        except Exception as e:
+            self._last_order_val = None
+            erro = f"Erro leitura SQL: {e}"
+            # A mesma falha repetida a cada scan não muda o que já foi publicado
+            if erro != self._ultimo_erro_leitura:
+                self._ultimo_erro_leitura = erro
+                self._update_shared_tags({
+                    tag['id']: {"valor": None, "qualidade": "ruim", "log": erro}
+                    for tag in self._enabled_tags
+                })
+            return
+        self._ultimo_erro_leitura = None
+        self._all_bad_marked = False
+
+        dados_lidos = {}
+        for tag in self._enabled_tags:
+            valor = row_dict.get(tag.get('endereco'))
+            dados_lidos[tag['id']] = {
+                "valor": valor,
+                "qualidade": "boa" if valor is not None else "ruim",
+                "log": "OK" if valor is not None else "Sem dados"
+            }
         self._update_shared_tags(dados_lidos)
 
     def _process_write_queue(self):
-        while not self.write_queue.empty():
+        """
+        Drena a fila de escrita, monta o comando de cada item e executa os comandos iguais e
+        consecutivos com um único `executemany`, com um único commit para toda a drenagem.
+        """
+        itens = self.write_queue.get_many_nowait()
+        if not itens:
+            return
+        lotes = []  # [(sql, [params, ...], [descricao, ...])], na ordem de chegada
+        self._ultimo_incremental = None
+        for item in itens:
             try:
-                item = self.write_queue.get_nowait()
                 if isinstance(item, tuple) and len(item) == 2:
                     tag_id, valor = item
-                    self._write_single_tag(tag_id, valor)
+                    comando = self._write_single_tag(tag_id, valor)
                 elif isinstance(item, dict):
-                    self._write_batch(item)
+                    comando = self._write_batch(item)
                 else:
                     if self.log_enabled:
                         log('WARN', self.source_name, f"Item inválido na fila de escrita SQL: {item}")
+                    continue
             except Exception as e:
                 if self.log_enabled:
                     log('ERROR', self.source_name, f"Exceção na escrita SQL: {e}")
+                continue
+            if comando is None:
+                continue
+            sql, params, descricao = comando
+            if lotes and lotes[-1][0] == sql:
+                lotes[-1][1].append(params)
+                lotes[-1][2].append(descricao)
+            else:
+                lotes.append((sql, [params], [descricao]))
+        if lotes:
+            self._executar_lotes(lotes)
+            # Um UPDATE pode alterar a linha mais recente sem mudar o MAX: força a releitura
+            # (contador em vez de limpar _last_order_val, que o scan pode estar gravando em paralelo)
+            self._geracao_escrita += 1
+
+    def _executar_lotes(self, lotes):
+        """
+        Executa os lotes em uma transação. Se ela falhar, desfaz e repete comando a comando,
+        para que um registro inválido não descarte as demais escritas da drenagem. Se nem o
+        rollback for possível, a conexão está perdida: o erro sobe para o loop de comunicação,
+        que reconecta e recria o cursor.
+        """
+        cursor = self._write_cursor
+        try:
+            for sql, params, _ in lotes:
+                if self.fast_executemany:
+                    cursor.setinputsizes(self._tipos_por_sql.get(sql))
+                cursor.executemany(sql, params)
+            self._write_conn.commit()
+        except Exception as e:
+            try:
+                self._write_conn.rollback()
+            except Exception:
+                self._write_cursor = None
+                raise
+            if self.log_enabled:
+                log('WARN', self.source_name, f"Falha na escrita SQL em lote ({e}); repetindo individualmente.")
+            for sql, params, descricoes in lotes:
+                if self.fast_executemany:
+                    cursor.setinputsizes(self._tipos_por_sql.get(sql))
+                for parametros, descricao in zip(params, descricoes):
+                    try:
+                        cursor.execute(sql, parametros)
+                        self._write_conn.commit()
+                        if self.log_enabled:
+                            log('INFO', self.source_name, descricao)
+                    except Exception as erro:
+                        try:
+                            self._write_conn.rollback()
+                        except Exception:
+                            pass
+                        if self.log_enabled:
+                            log('ERROR', self.source_name, f"Erro na escrita SQL: {erro} ({descricao})")
+            return
+        if self.log_enabled:
+            for _, _, descricoes in lotes:
+                for descricao in descricoes:
+                    log('INFO', self.source_name, descricao)
+
+    def _sql_insert(self, colunas):
+        """INSERT parametrizado para as colunas, montado uma vez por conjunto de colunas."""
+        sql = self._insert_sql_cache.get(colunas)
+        if sql is None:
+            placeholders = ', '.join('?' for _ in colunas)
+            sql = f"INSERT INTO {self._tabela_sql} ({', '.join(self._q(col) for col in colunas)}) VALUES ({placeholders})"
+            self._insert_sql_cache[colunas] = sql
+        self._registrar_tipos(sql, colunas)
+        return sql
+
+    def _registrar_tipos(self, sql, colunas):
+        """
+        Guarda os tipos ODBC dos parâmetros do comando (na ordem das colunas), usados em
+        `setinputsizes` para o pyodbc não descrever/inferir cada parâmetro a cada execução.
+        Só é registrado quando todas as colunas têm tipo conhecido.
+        """
+        if sql in self._tipos_por_sql:
+            return
+        tipos = self._schema_cache['tipos_parametro']
+        tamanhos = [tipos.get(col) for col in colunas]
+        self._tipos_por_sql[sql] = tamanhos if all(tamanhos) else None
 
+    def _proximo_incremental(self):
+        """
+        Próximo valor da primeira coluna inteira. O MAX é consultado uma vez por drenagem e
+        incrementado localmente, pois as linhas do lote só são inseridas juntas no final.
+        """
+        if self._ultimo_incremental is None:
+            self._write_cursor.execute(self._schema_cache['sql_max_first'])
+            self._ultimo_incremental = self._write_cursor.fetchone()[0] or 0
+        self._ultimo_incremental += 1
+        return self._ultimo_incremental
 
     def _write_single_tag(self, tag_id, valor):
-        tag_config = next((t for t in self.tags_config if t['id'] == tag_id), None)
+        """Monta o INSERT de uma tag. Retorna (sql, params, descricao) ou None se a escrita for ignorada."""
+        tag_config = self._tags_by_id.get(tag_id)
         if not tag_config or not tag_config.get('escrita_permitida'):
             if self.log_enabled:
                 log('WARN', self.source_name, f"Escrita ignorada para tag '{tag_id}' (não encontrada ou sem permissão).")
-            return
+            return None
         coluna = tag_config.get('endereco')
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(f"SELECT * FROM [{self.table_name}] LIMIT 1" if self.db_type != "sqlserver" else f"SELECT TOP 1 * FROM [{self.table_name}]")
-            columns = [desc[0] for desc in cursor.description]
-            col_types = [desc[1] for desc in cursor.description]
-            primeira_coluna = columns[0]
-            tipo_primeira = col_types[0]
+            primeira_coluna = self._schema_cache['first_col']
+            tipo_primeira = self._schema_cache['first_type']
             valores = {coluna: valor}
-            # Se a primeira coluna não for a coluna da tag, preencher automaticamente
-            if primeira_coluna != coluna:
+            # Se a primeira coluna não for a coluna da tag nem gerada pelo banco, preencher automaticamente
+            if primeira_coluna != coluna and not self._schema_cache['first_auto']:
                 if 'date' in str(tipo_primeira).lower() or 'time' in str(tipo_primeira).lower():
                     carimbo = datetime.now()
                     valores[primeira_coluna] = carimbo
-                    print(f"[SQLDriverProcess] Inserindo timestamp na coluna '{primeira_coluna}': {carimbo}")
                 elif 'int' in str(tipo_primeira).lower():
-                    cursor.execute(f"SELECT MAX([{primeira_coluna}]) FROM [{self.table_name}]")
-                    ultimo = cursor.fetchone()[0]
-                    novo_valor = (ultimo or 0) + 1
+                    novo_valor = self._proximo_incremental()
                     valores[primeira_coluna] = novo_valor
-                    print(f"[SQLDriverProcess] Inserindo valor incremental na coluna '{primeira_coluna}': {novo_valor}")
-            colunas_sql = ', '.join([f"[{col}]" for col in valores.keys()])
-            placeholders = ', '.join(['?' for _ in valores])
-            query = f"INSERT INTO [{self.table_name}] ({colunas_sql}) VALUES ({placeholders})"
-            cursor.execute(query, tuple(valores.values()))
-            self.conn.commit()
-            if self.log_enabled:
-                log('INFO', self.source_name, f"Escrita SQL convencional: {valores} (tag '{tag_id}')")
+            query = self._sql_insert(tuple(valores))
+            return query, tuple(valores.values()), f"Escrita SQL convencional: {valores} (tag '{tag_id}')"
         except Exception as e:
             if self.log_enabled:
                 log('ERROR', self.source_name, f"Erro na escrita SQL da tag '{tag_id}' (coluna '{coluna}'): {e}")
-
-
-
+            return None
 
     def _write_batch(self, item):
+        """Monta o INSERT/UPDATE de uma escrita em lote. Retorna (sql, params, descricao) ou None."""
         valores = item.get('valores')
         linha_id = item.get('linha_id')
         if not isinstance(valores, dict) or not valores:
             if self.log_enabled:
                 log('WARN', self.source_name, f"Escrita em lote ignorada: valores inválidos.")
-            return
+            return None
         try:
-            cursor = self.conn.cursor()
-            # Descobrir colunas e tipos
-            cursor.execute(f"SELECT * FROM [{self.table_name}] LIMIT 1" if self.db_type != "sqlserver" else f"SELECT TOP 1 * FROM [{self.table_name}]")
-            columns = [desc[0] for desc in cursor.description]
-            col_types = [desc[1] for desc in cursor.description]
-            primeira_coluna = columns[0]
-            tipo_primeira = col_types[0]
-            # Verificar se a primeira coluna está nos valores, se não, inserir
-            if primeira_coluna not in valores:
+            # Colunas e tipos vêm do cache carregado na conexão
+            primeira_coluna = self._schema_cache['first_col']
+            tipo_primeira = self._schema_cache['first_type']
+            # Verificar se a primeira coluna está nos valores, se não, inserir (exceto se gerada pelo banco)
+            if primeira_coluna not in valores and not self._schema_cache['first_auto']:
                 if 'date' in str(tipo_primeira).lower() or 'time' in str(tipo_primeira).lower():
                     # Inserir timestamp
                     carimbo = datetime.now()
                     valores[primeira_coluna] = carimbo
-                    print(f"[SQLDriverProcess] Inserindo timestamp na coluna '{primeira_coluna}': {carimbo}")
                 elif 'int' in str(tipo_primeira).lower():
-                    # Buscar último valor e incrementar
-                    cursor.execute(f"SELECT MAX([{primeira_coluna}]) FROM [{self.table_name}]")
-                    ultimo = cursor.fetchone()[0]
-                    novo_valor = (ultimo or 0) + 1
+                    # Último valor consultado/incrementado na drenagem
+                    novo_valor = self._proximo_incremental()
                     valores[primeira_coluna] = novo_valor
-                    print(f"[SQLDriverProcess] Inserindo valor incremental na coluna '{primeira_coluna}': {novo_valor}")
             # Garantir que os nomes das colunas correspondam ao campo 'endereco' das tags
             colunas = []
             params = []
             for tag_id, valor in valores.items():
-                tag_config = next((t for t in self.tags_config if t['id'] == tag_id), None)
+                tag_config = self._tags_by_id.get(tag_id)
                 if tag_config:
                     coluna_nome = tag_config.get('endereco')
-                    colunas.append(f"[{coluna_nome}]")
+                    colunas.append(coluna_nome)
                     params.append(valor)
             # Adicionar a primeira coluna se não estiver nas tags
-            if primeira_coluna not in [tag_config.get('endereco') for tag_config in self.tags_config if tag_config]:
-                colunas.insert(0, f"[{primeira_coluna}]")
+            if primeira_coluna not in self._enderecos_tags and primeira_coluna in valores:
+                colunas.insert(0, primeira_coluna)
                 params.insert(0, valores[primeira_coluna])
             if linha_id:
-                set_clause = ', '.join([f"{col} = ?" for col in colunas])
-                query = f"UPDATE [{self.table_name}] SET {set_clause} WHERE id = ?"
-                cursor.execute(query, tuple(params) + (linha_id,))
-                self.conn.commit()
-                if self.log_enabled:
-                    log('INFO', self.source_name, f"Escrita SQL em lote (UPDATE id={linha_id}): {valores}")
-            else:
-                placeholders = ', '.join(['?' for _ in colunas])
-                query = f"INSERT INTO [{self.table_name}] ({', '.join(colunas)}) VALUES ({placeholders})"
-                cursor.execute(query, tuple(params))
-                self.conn.commit()
-                if self.log_enabled:
-                    log('INFO', self.source_name, f"Escrita SQL em lote (INSERT): {valores}")
+                set_clause = ', '.join([f"{self._q(col)} = ?" for col in colunas])
+                query = f"UPDATE {self._tabela_sql} SET {set_clause} WHERE id = ?"
+                self._registrar_tipos(query, colunas + ['id'])
+                return query, tuple(params) + (linha_id,), f"Escrita SQL em lote (UPDATE id={linha_id}): {valores}"
+            query = self._sql_insert(tuple(colunas))
+            return query, tuple(params), f"Escrita SQL em lote (INSERT): {valores}"
         except Exception as e:
             if self.log_enabled:
                 log('ERROR', self.source_name, f"Erro na escrita SQL em lote: {e}")
+            return None
+
+    def _publicar(self):
+        """Publica o registro local no dicionário compartilhado com uma única atribuição."""
+        try:
+            self.shared_data[self.driver_id] = self._local_snapshot
+            self._last_publish = time.monotonic()
+            self._publicacao_pendente = False
+        except Exception as e:
+            if self.log_enabled:
+                log('ERROR', self.source_name, f"Falha ao publicar dados compartilhados: {e}")
+
+    def _maybe_publish(self, forcar: bool = False):
+        """Publica as atualizações pendentes se o intervalo de publicação já passou (ou se forçado)."""
+        if self._publicacao_pendente and (forcar or time.monotonic() - self._last_publish >= self.publish_interval_s):
+            self._publicar()
 
     def _update_shared_status(self, status: str, detalhe: str):
         try:
-            driver_data = self.shared_data.get(self.driver_id, {})
-            driver_data.update({
+            self._local_snapshot.update({
                 "status_conexao": status,
                 "detalhe": detalhe,
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "config": self.driver_config,
-                "tags": driver_data.get("tags", {}),
                 "log": detalhe
             })
-            self.shared_data[self.driver_id] = driver_data
         except Exception as e:
             if self.log_enabled:
                 log('ERROR', self.source_name, f"Falha ao atualizar status compartilhado: {e}")
+            return
+        self._publicar()
 
-    def _update_shared_tags(self, dados_lidos: dict):
+    def _update_shared_tags(self, dados_lidos: dict, imediato: bool = False):
+        """
+        Aplica o lote ao registro local. A publicação é agrupada por publish_interval, salvo
+        com `imediato` (ex.: todas as tags ruins na desconexão).
+        """
         try:
-            driver_data = self.shared_data.get(self.driver_id)
-            if not driver_data:
-                driver_data = {}
-            tags_data = driver_data.get("tags", {})
+            tags_data = self._local_snapshot["tags"]
+            # Um único timestamp formatado por lote, compartilhado por todas as tags
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             for tag_id, data in dados_lidos.items():
-                tag_config = next((t for t in self.tags_config if t['id'] == tag_id), {})
+                tag_config = self._tags_by_id.get(tag_id, {})
                 tag_status = {
                     "id": tag_id,
                     "id_driver": self.driver_id,
@@ -437,30 +778,34 @@ class SQLDriverProcess(Process):
                     "tipo_dado": tag_config.get('tipo_dado', '--'),
                     "valor": data.get('valor'),
                     "qualidade": data.get('qualidade'),
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "timestamp": timestamp,
                     "log": data.get('log', '')
                 }
                 if 'campo_exibir' in tag_config:
                     tag_status['campo_exibir'] = tag_config['campo_exibir']
                 tags_data[tag_id] = tag_status
-            driver_data["tags"] = tags_data
-            self.shared_data[self.driver_id] = driver_data
         except Exception as e:
             if self.log_enabled:
                 log('ERROR', self.source_name, f"Falha ao atualizar tags compartilhadas: {e}")
+            return
+        self._publicacao_pendente = True
+        self._maybe_publish(forcar=imediato)
 
     def _mark_all_tags_bad(self, log_msg: str):
+        # Já marcadas desde a última conexão/leitura boa: nada a reescrever
+        if self._all_bad_marked:
+            return
+        self._all_bad_marked = True
         dados_ruins = {
             tag['id']: {"valor": None, "qualidade": "ruim", "log": log_msg}
             for tag in self.tags_config
         }
-        self._update_shared_tags(dados_ruins)
+        self._update_shared_tags(dados_ruins, imediato=True)
 
     def parar(self):
         self.running = False
         try:
-            if self.conn:
-                self.conn.close()
+            self._fechar_conexoes()
             if self.log_enabled:
                 log('INFO', self.source_name, "Conexão SQL encerrada.")
         except Exception as e:
@@ -1,84 +1,198 @@
 # ia/cerebro_coletivo/grafo_conhecimento.py
 
+import threading
+import time
+from collections import deque
+from itertools import islice
 from typing import Dict, Any, List, Optional
 from multiprocessing import Manager
+from multiprocessing.managers import BaseManager
 from datetime import datetime
 from modulos.logger import log
 
+TIPOS_INSIGHT = ('anomalias', 'correlacoes', 'otimizacoes')
+
+def _iso(epoch: float) -> str:
+    """Formata um instante (time.time()) como ISO 8601 local, igual a datetime.now().isoformat()."""
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
+# Insights mantidos por tipo; os mais antigos são descartados ao atingir o limite
+MAX_INSIGHTS_POR_TIPO = 1024
+
+
+class _EstadoGrafo:
+    """
+    Estado do grafo mantido no processo servidor do `GerenciadorGrafo`, em dicts e listas comuns.
+
+    Cada método é uma operação completa (ler, alterar, carimbar), então cada chamada feita pelo
+    proxy é um único round-trip, em vez de um por proxy aninhado (dict de dicts/listas).
+    As conexões de clientes são atendidas em threads no servidor, daí a trava.
+
+    Os carimbos de tempo são guardados como `time.time()` e só formatados (ISO 8601) nas
+    consultas, em vez de um strftime/isoformat a cada atualização.
+    """
+
+    def __init__(self, max_insights: int = MAX_INSIGHTS_POR_TIPO):
+        self._lock = threading.Lock()
+        self.estados: Dict[str, Dict] = {}
+        # Buffers circulares: memória limitada e append O(1), independente do tempo de execução
+        self.insights: Dict[str, deque] = {tipo: deque(maxlen=max_insights) for tipo in TIPOS_INSIGHT}
+        # Versão do conhecimento: incrementada junto com cada insight publicado, sob a mesma trava
+        self.versao = 0
+
+    def registrar_no(self, id_no: str, tipo_no: str) -> bool:
+        """Registra o nó se ainda não existir. Retorna True se foi registrado agora."""
+        with self._lock:
+            if id_no in self.estados:
+                return False
+            self.estados[id_no] = {
+                'tipo': tipo_no,
+                'saude': 'INICIANDO',
+                'metricas': {},
+                'ultima_atualizacao': time.time()
+            }
+            return True
+
+    def atualizar_estado_no(self, id_no: str, novo_estado: Dict) -> bool:
+        """Mescla o novo estado e carimba a atualização. Retorna False se o nó não existe."""
+        with self._lock:
+            estado = self.estados.get(id_no)
+            if estado is None:
+                return False
+            estado.update(novo_estado)
+            estado['ultima_atualizacao'] = time.time()
+            return True
+
+    def adicionar_insight(self, tipo_insight: str, insight: Dict) -> Optional[int]:
+        """Publica um insight e retorna a nova versão do conhecimento, ou None se o tipo é desconhecido."""
+        with self._lock:
+            lista = self.insights.get(tipo_insight)
+            if lista is None:
+                return None
+            lista.append(insight)
+            self.versao += 1
+            return self.versao
+
+    def versao_atual(self) -> int:
+        """Versão do conhecimento (quantidade de insights já publicados)."""
+        return self.versao
+
+    def insights_recentes(self, tipo_insight: str, limite: int) -> List:
+        """Os `limite` insights mais recentes, em ordem de publicação, sem copiar o buffer inteiro."""
+        with self._lock:
+            insights = self.insights.get(tipo_insight)
+            if not insights:
+                return []
+            recentes = list(islice(reversed(insights), limite))[::-1]
+        return [{**insight, 'timestamp': _iso(insight['timestamp'])} for insight in recentes]
+
+    def estados_dos_nos(self, ids_dos_nos: Optional[List[str]] = None) -> Dict:
+        """Cópia dos estados (todos ou só os ids pedidos), devolvida em uma única resposta."""
+        with self._lock:
+            if ids_dos_nos:
+                copias = {id_no: dict(self.estados.get(id_no, {})) for id_no in ids_dos_nos}
+            else:
+                copias = {id_no: dict(estado) for id_no, estado in self.estados.items()}
+        for estado in copias.values():
+            if 'ultima_atualizacao' in estado:
+                estado['ultima_atualizacao'] = _iso(estado['ultima_atualizacao'])
+        return copias
+
+
+class GerenciadorGrafo(BaseManager):
+    """Manager dedicado ao estado do grafo (tipos registrados antes do `start`)."""
+
+
+GerenciadorGrafo.register('EstadoGrafo', _EstadoGrafo)
+
+
 class GrafoDeConhecimento:
     """
     Representa o Cérebro Coletivo ou a Memória Global do Ecossistema de IA.
     É um repositório distribuído e seguro para os Nós Cognitivos
     publicarem e consultarem o estado e os insights do ecossistema.
+
+    O estado fica em um único objeto `_EstadoGrafo` servido por um `GerenciadorGrafo`. Se o
+    `manager` recebido já for um `GerenciadorGrafo` iniciado, ele é reutilizado (e continua sendo
+    de quem o criou); caso contrário (ex.: um `Manager()` comum, que já está em execução e não
+    aceita novos tipos), um `GerenciadorGrafo` próprio é iniciado e encerrado em `parar()`.
     """
     
     def __init__(self, manager: Manager):
         self.manager = manager
         self.fonte_log = "GRAFO_CONHECIMENTO"
-        
-        # Mapa em tempo real do estado de cada nó no ecossistema.
-        self.estados_dos_nos = self.manager.dict()
-        
-        # "Quadro de avisos" para descobertas importantes.
-        self.insights_compartilhados = self.manager.dict({
-            'anomalias': self.manager.list(),
-            'correlacoes': self.manager.list(),
-            'otimizacoes': self.manager.list(),
-        })
-        
-        # Contador de versão para otimizar consultas futuras.
-        self.versao_conhecimento = self.manager.Value('i', 0)
+
+        # Estado dos nós e quadro de avisos (insights) em um único proxy.
+        if isinstance(manager, GerenciadorGrafo):
+            self._gerenciador = manager
+            self._gerenciador_proprio = False
+        else:
+            self._gerenciador = GerenciadorGrafo()
+            self._gerenciador.start()
+            self._gerenciador_proprio = True
+        self._estado = self._gerenciador.EstadoGrafo()
         
         log('SUCCESS', self.fonte_log, "Cérebro Coletivo (Grafo de Conhecimento) inicializado.")
 
+    @property
+    def versao_conhecimento(self) -> int:
+        """
+        Contador de versão para otimizar consultas futuras. Mantido no `_EstadoGrafo` e
+        incrementado atomicamente a cada insight publicado.
+        """
+        return self._estado.versao_atual()
+
     # --- MÉTODO CORRIGIDO ---
     def registrar_no(self, id_no: str, tipo_no: str):
         """
         Adiciona um novo Nó Cognitivo ao mapa de estados do ecossistema.
         """
-        if id_no not in self.estados_dos_nos:
-            self.estados_dos_nos[id_no] = self.manager.dict({
-                'tipo': tipo_no,
-                'saude': 'INICIANDO',
-                'metricas': {},
-                'ultima_atualizacao': datetime.now().isoformat()
-            })
+        if self._estado.registrar_no(id_no, tipo_no):
             log('INFO', self.fonte_log, f"Novo nó '{id_no}' registrado no ecossistema.")
 
     def atualizar_estado_no(self, id_no: str, novo_estado: Dict):
         """
         Atualiza as informações de um nó específico no mapa de estados.
         """
-        if id_no in self.estados_dos_nos:
-            self.estados_dos_nos[id_no].update(novo_estado)
-            self.estados_dos_nos[id_no]['ultima_atualizacao'] = datetime.now().isoformat()
-        else:
+        # Uma única chamada: a mescla e o carimbo de tempo são feitos no servidor.
+        if not self._estado.atualizar_estado_no(id_no, novo_estado):
             log('WARN', self.fonte_log, f"Tentativa de atualizar o estado de um nó não registrado: {id_no}")
 
-    def compartilhar_conhecimento(self, id_no_origem: str, tipo_insight: str, dados: Dict):
+    def compartilhar_conhecimento(self, id_no_origem: str, tipo_insight: str, dados: Dict) -> Optional[int]:
         """
         Permite que um nó publique uma nova descoberta no quadro de avisos global.
+        Retorna a versão do conhecimento após a publicação (None se o tipo é desconhecido).
         """
-        if tipo_insight in self.insights_compartilhados:
-            insight = {'origem': id_no_origem, 'dados': dados, 'timestamp': datetime.now().isoformat()}
-            self.insights_compartilhados[tipo_insight].append(insight)
-            self.versao_conhecimento.value += 1
+        insight = {'origem': id_no_origem, 'dados': dados, 'timestamp': time.time()}
+        # Uma única chamada: insight e versão são atualizados juntos no servidor.
+        versao = self._estado.adicionar_insight(tipo_insight, insight)
+        if versao is not None:
             log('IA_INFO', self.fonte_log, f"Nó '{id_no_origem}' compartilhou novo conhecimento: '{tipo_insight}'.")
         else:
             log('WARN', self.fonte_log, f"Nó '{id_no_origem}' tentou compartilhar um tipo de insight desconhecido: '{tipo_insight}'.")
+        return versao
 
     def consultar_conhecimento_recente(self, tipo_insight: str, limite: int = 10) -> List:
         """
         Permite que um nó consulte as descobertas mais recentes de outros nós.
         """
-        if tipo_insight in self.insights_compartilhados:
-            return list(self.insights_compartilhados[tipo_insight])[-limite:]
-        return []
+        return self._estado.insights_recentes(tipo_insight, limite)
 
     def consultar_estados_dos_nos(self, ids_dos_nos: Optional[List[str]] = None) -> Dict:
         """
         Permite a consulta ao estado de nós específicos ou de todo o ecossistema.
         """
-        if ids_dos_nos:
-            return {id_no: dict(self.estados_dos_nos.get(id_no, {})) for id_no in ids_dos_nos}
-        return {id_no: dict(estado) for id_no, estado in self.estados_dos_nos.items()}
\ No newline at end of file
+        return self._estado.estados_dos_nos(ids_dos_nos)
+
+    def parar(self):
+        """
+        Encerra o processo servidor do `GerenciadorGrafo` próprio deste grafo (se houver).
+        Pode ser chamado mais de uma vez.
+        """
+        if self._gerenciador_proprio and self._gerenciador is not None:
+            try:
+                self._gerenciador.shutdown()
+            except Exception as e:
+                log('WARN', self.fonte_log, f"Falha ao encerrar o gerenciador do grafo: {e}")
+            self._gerenciador = None
@@ -3,12 +3,61 @@ Gerenciador de Checkpoints para modelos de IA
 """
 
 import os
+import heapq
 import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional
 from modulos.logger import log
 
+# Remoções de checkpoints em paralelo (limitadas: o gargalo é a latência de unlink, não a CPU)
+MAX_THREADS_REMOCAO = 8
+
+# msgpack é opcional: sem ele (ou se as informações tiverem tipos que ele não representa)
+# o info do checkpoint é gravado em JSON, como antes
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# info.msgpack: [tamanho do payload: uint32 big-endian][payload msgpack]
+INFO_MSGPACK = 'info.msgpack'
+INFO_JSON = 'info.json'
+
+
+def _gravar_info(checkpoint_dir: str, info: Dict[str, Any]) -> str:
+    """Grava as informações do checkpoint (msgpack com prefixo de tamanho ou JSON). Retorna o caminho."""
+    if msgpack is not None:
+        try:
+            payload = msgpack.packb(info, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError):
+            payload = None
+        if payload is not None:
+            info_path = os.path.join(checkpoint_dir, INFO_MSGPACK)
+            with open(info_path, 'wb') as f:
+                f.write(len(payload).to_bytes(4, 'big') + payload)
+            return info_path
+    info_path = os.path.join(checkpoint_dir, INFO_JSON)
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+    return info_path
+
+
+def _ler_info(checkpoint_dir: str) -> Dict[str, Any]:
+    """Lê as informações do checkpoint no formato em que foram gravadas (checkpoints antigos usam JSON)."""
+    info_path = os.path.join(checkpoint_dir, INFO_MSGPACK)
+    if msgpack is not None and os.path.exists(info_path):
+        with open(info_path, 'rb') as f:
+            tamanho = int.from_bytes(f.read(4), 'big')
+            payload = f.read(tamanho)
+        if len(payload) != tamanho:
+            raise ValueError(f"{info_path} truncado ({len(payload)} de {tamanho} bytes)")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    with open(os.path.join(checkpoint_dir, INFO_JSON), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 class CheckpointManager:
     def __init__(self, base_dir: str):
         """
@@ -21,6 +70,12 @@ class CheckpointManager:
         os.makedirs(base_dir, exist_ok=True)
         self.source_name = "CHECKPOINT_MGR"
         
+    @staticmethod
+    def _listar_checkpoints(node_dir: str) -> list:
+        """Nomes dos diretórios de checkpoint do nó, usando o tipo já retornado pelo scandir (sem um stat por entrada)."""
+        with os.scandir(node_dir) as entradas:
+            return [entrada.name for entrada in entradas if entrada.is_dir()]
+        
     def salvar_checkpoint(self, 
                          node_id: str, 
                          modelo: Any, 
@@ -58,9 +113,7 @@ class CheckpointManager:
                 'metricas': metricas,
                 'metadata': metadata or {}
             }
-            info_path = os.path.join(checkpoint_dir, 'info.json')
-            with open(info_path, 'w', encoding='utf-8') as f:
-                json.dump(info, f, indent=2, ensure_ascii=False)
+            _gravar_info(checkpoint_dir, info)
             
             # Registra no log
             log('IA_MODEL', self.source_name, 
@@ -95,24 +148,20 @@ class CheckpointManager:
                 return None
                 
             # Lista todos os checkpoints
-            checkpoints = [d for d in os.listdir(node_dir) 
-                         if os.path.isdir(os.path.join(node_dir, d))]
+            checkpoints = self._listar_checkpoints(node_dir)
             
             if not checkpoints:
                 log('IA_WARN', self.source_name, 
                     f"Nenhum checkpoint encontrado para nó {node_id}")
                 return None
                 
-            # Pega o mais recente
-            ultimo_checkpoint = sorted(checkpoints)[-1]
+            # Pega o mais recente (o nome contém o timestamp ordenável)
+            ultimo_checkpoint = max(checkpoints)
             checkpoint_dir = os.path.join(node_dir, ultimo_checkpoint)
             
             # Carrega modelo e informações
             modelo_path = os.path.join(checkpoint_dir, 'modelo.pkl')
-            info_path = os.path.join(checkpoint_dir, 'info.json')
-            
-            with open(info_path, 'r', encoding='utf-8') as f:
-                info = json.load(f)
+            info = _ler_info(checkpoint_dir)
                 
             log('IA_MODEL', self.source_name,
                 f"Checkpoint carregado para nó {node_id}",
@@ -146,17 +195,20 @@ class CheckpointManager:
             if not os.path.exists(node_dir):
                 return
                 
-            checkpoints = [d for d in os.listdir(node_dir) 
-                         if os.path.isdir(os.path.join(node_dir, d))]
+            checkpoints = self._listar_checkpoints(node_dir)
             
-            if len(checkpoints) <= manter_quantidade:
+            # Quantidade <= 0 nunca removeu nada (fatia [:-0] vazia); mantido assim por segurança
+            if manter_quantidade <= 0 or len(checkpoints) <= manter_quantidade:
                 return
                 
-            # Ordena por data e remove os mais antigos
-            checkpoints_ordenados = sorted(checkpoints)
-            for checkpoint in checkpoints_ordenados[:-manter_quantidade]:
-                checkpoint_dir = os.path.join(node_dir, checkpoint)
-                shutil.rmtree(checkpoint_dir)
+            # Seleciona os mais recentes sem ordenar tudo (o nome contém o timestamp) e remove os demais
+            manter = set(heapq.nlargest(manter_quantidade, checkpoints))
+            remover = [os.path.join(node_dir, checkpoint) for checkpoint in checkpoints
+                       if checkpoint not in manter]
+            # rmtree libera o GIL nos unlinks: várias árvores são removidas ao mesmo tempo
+            with ThreadPoolExecutor(max_workers=min(MAX_THREADS_REMOCAO, len(remover)),
+                                    thread_name_prefix=self.source_name) as executor:
+                list(executor.map(shutil.rmtree, remover))
                 
             log('IA_INFO', self.source_name,
                 f"Checkpoints antigos removidos para nó {node_id}",
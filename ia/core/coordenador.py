@@ -2,12 +2,97 @@
 Módulo de coordenação entre IAs do sistema InLogic ECID.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from datetime import datetime
+from collections import deque
+from copy import deepcopy
+from functools import partial
+from types import MappingProxyType
 import threading
 import queue
 from multiprocessing import Manager
 
+# Interações mantidas no registro (as mais antigas são descartadas)
+MAX_REGISTROS_INTERACAO = 1000
+# Com Manager, o excesso é cortado a cada N registros, com uma única chamada
+CORTE_REGISTROS_INTERACAO = 100
+
+# Máximo de mensagens retiradas de uma fila por ciclo; o restante fica para o próximo
+LIMITE_DRENAGEM = 256
+
+
+def _drenar_fila(fila, limite: int = LIMITE_DRENAGEM, timeout: float = 0.05) -> List[Dict]:
+    """
+    Retira até `limite` mensagens da fila. Em filas do Manager cada `empty()` é uma chamada ao
+    servidor (e pode mudar antes do `get`), então só se usa `get`: o primeiro espera até
+    `timeout`, os demais param no primeiro `queue.Empty`.
+    """
+    mensagens = []
+    try:
+        mensagens.append(fila.get(timeout=timeout))
+        while len(mensagens) < limite:
+            mensagens.append(fila.get_nowait())
+    except queue.Empty:
+        pass
+    return mensagens
+
+
+# --- Mescla de conhecimento: uma função por tipo de valor, escolhida por type(valor) ---
+
+def _mesclar_colecao(destino: Dict, chave, valor, contagens: Dict, id_media):
+    """Listas/conjuntos: acumula em um set durante a consolidação."""
+    atual = destino[chave]
+    if not isinstance(atual, set):
+        atual = destino[chave] = set(atual)
+    atual.update(valor)
+
+
+def _mesclar_dict(destino: Dict, chave, valor, contagens: Dict, id_media):
+    destino[chave].update(valor)
+
+
+def _mesclar_numero(destino: Dict, chave, valor, contagens: Dict, id_media):
+    """Numéricos: média acumulada de todos os valores integrados."""
+    n = contagens.get(id_media, 1)
+    destino[chave] += (valor - destino[chave]) / (n + 1)
+    contagens[id_media] = n + 1
+
+
+def _substituir(destino: Dict, chave, valor, contagens: Dict, id_media):
+    destino[chave] = valor
+
+
+_MESCLAS = {
+    list: _mesclar_colecao,
+    set: _mesclar_colecao,
+    dict: _mesclar_dict,
+    int: _mesclar_numero,
+    float: _mesclar_numero,
+    bool: _mesclar_numero,
+    str: _substituir,
+    type(None): _substituir,
+}
+
+
+def _mescla_para(tipo: type):
+    """
+    Função de mescla de um tipo. Tipos fora da tabela (subclasses, numpy etc.) são resolvidos
+    uma vez por isinstance, como antes, e guardados na tabela.
+    """
+    mescla = _MESCLAS.get(tipo)
+    if mescla is None:
+        if issubclass(tipo, (list, set)):
+            mescla = _mesclar_colecao
+        elif issubclass(tipo, dict):
+            mescla = _mesclar_dict
+        elif issubclass(tipo, (int, float)):
+            mescla = _mesclar_numero
+        else:
+            mescla = _substituir
+        _MESCLAS[tipo] = mescla
+    return mescla
+
+
 class CoordenadorIA:
     """
     Coordenador central do sistema de IAs.
@@ -18,17 +103,26 @@ class CoordenadorIA:
     - Gestão de recursos compartilhados
     """
     
-    def __init__(self, manager: Manager):
+    def __init__(self, manager: Optional[Manager] = None):
         """
         Inicializa o coordenador.
         
         Args:
-            manager: Gerenciador de recursos compartilhados
+            manager: Gerenciador de recursos compartilhados. Só é necessário quando IAs em outros
+                processos acessam o coordenador; sem ele (IAs em threads do mesmo processo) as
+                estruturas são locais, sem uma chamada ao servidor do Manager a cada acesso.
         """
         self.manager = manager
+        if manager is not None:
+            criar_dict, criar_fila, criar_lista = manager.dict, manager.Queue, manager.list
+        else:
+            criar_dict, criar_fila = dict, queue.Queue
+            criar_lista = partial(deque, maxlen=MAX_REGISTROS_INTERACAO)
+        # Protege as leituras/escritas compostas de conhecimento_global e estado_sync entre threads
+        self._lock = threading.Lock()
         
         # Dados compartilhados entre IAs
-        self.conhecimento_global = self.manager.dict({
+        self.conhecimento_global = criar_dict({
             'padroes_detectados': {},
             'anomalias_conhecidas': {},
             'correlacoes': {},
@@ -37,34 +131,47 @@ class CoordenadorIA:
         
         # Filas de comunicação
         self.filas_comunicacao = {
-            'tag': self.manager.Queue(),
-            'driver': self.manager.Queue(),
-            'processo': self.manager.Queue(),
-            'coordenacao': self.manager.Queue()
+            'tag': criar_fila(),
+            'driver': criar_fila(),
+            'processo': criar_fila(),
+            'coordenacao': criar_fila()
         }
         
         # Estado de sincronização
-        self.estado_sync = self.manager.dict({
+        self.estado_sync = criar_dict({
             'ultima_sync': None,
             'nos_sincronizados': set(),
             'versao_conhecimento': 0
         })
         
+        # Cópia somente leitura do conhecimento global, refeita só quando a versão muda
+        self._snapshot: Mapping[str, Any] = MappingProxyType({})
+        self._snapshot_versao = -1
+        
         # Registro de interações
-        self.registro_interacoes = self.manager.list()
+        self.registro_interacoes = criar_lista()
+        self._registros_desde_corte = 0
         
-        # Controle
+        # Controle: as threads esperam no evento de parada, que as acorda imediatamente no parar()
         self.running = False
+        self._evento_parada = threading.Event()
+        # Avisa a thread de distribuição de novas mensagens, em vez de ela consultar as filas a cada segundo
+        self._cv_mensagens = threading.Condition()
+        self._mensagens_pendentes = 0
         self.threads = {}
         
     def iniciar(self):
         """Inicia o coordenador."""
         self.running = True
+        self._evento_parada.clear()
         self._iniciar_threads_coordenacao()
         
     def parar(self):
         """Para o coordenador de forma segura."""
         self.running = False
+        self._evento_parada.set()
+        with self._cv_mensagens:
+            self._cv_mensagens.notify_all()
         for thread in self.threads.values():
             thread.join(timeout=5)
             
@@ -86,70 +193,96 @@ class CoordenadorIA:
         
     def _thread_sincronizacao(self):
         """Thread de sincronização entre IAs."""
-        while self.running:
+        while not self._evento_parada.is_set():
             try:
                 self._sincronizar_conhecimento()
                 self._verificar_consistencia()
                 self._atualizar_estado_sync()
             except Exception as e:
                 print(f"Erro na sincronização: {str(e)}")
-            threading.Event().wait(30)  # Sincroniza a cada 30 segundos
+            self._evento_parada.wait(30)  # Sincroniza a cada 30 segundos
             
     def _thread_distribuicao_conhecimento(self):
-        """Thread de distribuição de conhecimento."""
-        while self.running:
+        """
+        Thread de distribuição de conhecimento. Dorme até `compartilhar_conhecimento` avisar de
+        novas mensagens (ou até a parada). Com Manager, outros processos podem publicar nas filas
+        sem avisar, então as filas também são verificadas a cada segundo.
+        """
+        espera_maxima = None if self.manager is None else 1.0
+        while not self._evento_parada.is_set():
+            with self._cv_mensagens:
+                self._cv_mensagens.wait_for(
+                    lambda: self._mensagens_pendentes or self._evento_parada.is_set(),
+                    timeout=espera_maxima)
+                self._mensagens_pendentes = 0
+            if self._evento_parada.is_set():
+                break
             try:
-                mensagens = self._coletar_mensagens()
-                if mensagens:
-                    self._distribuir_conhecimento(mensagens)
+                # Cada coleta retira no máximo LIMITE_DRENAGEM por fila: repete enquanto alguma
+                # fila entregou o lote cheio, para não deixar o resto de uma rajada esperando
+                restam = True
+                while restam and not self._evento_parada.is_set():
+                    mensagens, restam = self._coletar_mensagens()
+                    if mensagens:
+                        self._distribuir_conhecimento(mensagens)
             except Exception as e:
                 print(f"Erro na distribuição: {str(e)}")
-            threading.Event().wait(1)  # Processa a cada segundo
             
     def _sincronizar_conhecimento(self):
         """Sincroniza conhecimento entre todas as IAs."""
         conhecimento_consolidado = {}
+        contagens = {}  # (categoria, chave) -> valores numéricos já integrados na média
         
         # Coleta conhecimento de cada tipo de IA
         for tipo_ia in ['tag', 'driver', 'processo']:
-            try:
-                while not self.filas_comunicacao[tipo_ia].empty():
-                    conhecimento = self.filas_comunicacao[tipo_ia].get_nowait()
-                    self._integrar_conhecimento(conhecimento_consolidado, conhecimento)
-            except queue.Empty:
-                continue
+            for conhecimento in _drenar_fila(self.filas_comunicacao[tipo_ia]):
+                self._integrar_conhecimento(conhecimento_consolidado, conhecimento, contagens)
                 
         # Atualiza conhecimento global
         if conhecimento_consolidado:
-            self.estado_sync['versao_conhecimento'] += 1
-            self.conhecimento_global.update(conhecimento_consolidado)
+            self._finalizar_consolidacao(conhecimento_consolidado)
+            with self._lock:
+                self.estado_sync['versao_conhecimento'] += 1
+                self.conhecimento_global.update(conhecimento_consolidado)
             
-    def _integrar_conhecimento(self, base: Dict, novo: Dict):
+    def _integrar_conhecimento(self, base: Dict, novo: Dict, contagens: Optional[Dict] = None):
         """
         Integra novo conhecimento à base existente.
         
+        Numéricos viram a média de todos os valores integrados (média acumulada com a contagem
+        em `contagens`, em vez de (antigo + novo) / 2, que dava peso 1/2 ao último valor).
+        Listas/conjuntos são acumulados em um `set` durante a consolidação, sem recriar a lista
+        a cada mescla; `_finalizar_consolidacao` os converte de volta em listas.
+        
         Args:
             base: Conhecimento base
             novo: Novo conhecimento a ser integrado
+            contagens: Quantidade de valores já integrados em cada média, por (categoria, chave)
         """
+        if contagens is None:
+            contagens = {}
         for categoria, dados in novo.items():
             if categoria not in base:
                 base[categoria] = {}
                 
             if isinstance(dados, dict):
+                destino = base[categoria]
                 for chave, valor in dados.items():
-                    if chave in base[categoria]:
-                        # Combina conhecimento existente com novo
-                        if isinstance(valor, (list, set)):
-                            base[categoria][chave] = list(set(base[categoria][chave] + valor))
-                        elif isinstance(valor, dict):
-                            base[categoria][chave].update(valor)
-                        elif isinstance(valor, (int, float)):
-                            base[categoria][chave] = (base[categoria][chave] + valor) / 2
-                        else:
-                            base[categoria][chave] = valor
+                    if chave in destino:
+                        # Combina conhecimento existente com novo (função escolhida pelo tipo do valor)
+                        mescla = _MESCLAS.get(type(valor)) or _mescla_para(type(valor))
+                        mescla(destino, chave, valor, contagens, (categoria, chave))
                     else:
-                        base[categoria][chave] = valor
+                        destino[chave] = valor
+
+    @staticmethod
+    def _finalizar_consolidacao(base: Dict):
+        """Converte os conjuntos acumulados na consolidação de volta em listas (formato publicado)."""
+        for dados in base.values():
+            if isinstance(dados, dict):
+                for chave, valor in dados.items():
+                    if isinstance(valor, set):
+                        dados[chave] = list(valor)
                         
     def registrar_ia(self, tipo_ia: str, id_ia: str) -> bool:
         """
@@ -197,25 +330,37 @@ class CoordenadorIA:
             }
             
             self.filas_comunicacao[tipo_ia].put(conhecimento_formatado)
+            with self._cv_mensagens:
+                self._mensagens_pendentes += 1
+                self._cv_mensagens.notify()
             self._registrar_interacao(id_ia, 'compartilhar', conhecimento_formatado)
             return True
         except Exception as e:
             print(f"Erro ao compartilhar conhecimento: {str(e)}")
             return False
             
-    def obter_conhecimento_global(self, tipo_ia: str, id_ia: str) -> Dict[str, Any]:
+    def obter_conhecimento_global(self, tipo_ia: str, id_ia: str) -> Mapping[str, Any]:
         """
         Obtém conhecimento global atual do sistema.
         
+        A cópia só é refeita quando `versao_conhecimento` muda; entre sincronizações todas as
+        consultas recebem o mesmo objeto, por isso ele é somente leitura (use `dict(...)` ou
+        `copy.deepcopy` para alterar).
+        
         Args:
             tipo_ia: Tipo da IA solicitante
             id_ia: Identificador da IA solicitante
             
         Returns:
-            Dict com conhecimento global
+            Mapping somente leitura com o conhecimento global
         """
         try:
-            conhecimento = dict(self.conhecimento_global)
+            with self._lock:
+                versao = self.estado_sync['versao_conhecimento']
+                if versao != self._snapshot_versao:
+                    self._snapshot = MappingProxyType(deepcopy(dict(self.conhecimento_global)))
+                    self._snapshot_versao = versao
+                conhecimento = self._snapshot
             self._registrar_interacao(id_ia, 'consulta', None)
             return conhecimento
         except Exception as e:
@@ -231,21 +376,31 @@ class CoordenadorIA:
             'dados': dados
         }
         self.registro_interacoes.append(registro)
+        if self.manager is None:
+            return  # o deque local já descarta os mais antigos
         
-        # Mantém apenas os últimos 1000 registros
-        if len(self.registro_interacoes) > 1000:
-            self.registro_interacoes.pop(0)
+        # Lista do Manager: em vez de len + pop(0) (O(n)) a cada registro, corta o excesso de uma
+        # vez a cada CORTE_REGISTROS_INTERACAO registros (no máximo MAX + CORTE entre cortes)
+        self._registros_desde_corte += 1
+        if self._registros_desde_corte >= CORTE_REGISTROS_INTERACAO:
+            self._registros_desde_corte = 0
+            excesso = len(self.registro_interacoes) - MAX_REGISTROS_INTERACAO
+            if excesso > 0:
+                del self.registro_interacoes[:excesso]
             
-    def _coletar_mensagens(self) -> List[Dict]:
-        """Coleta mensagens de todas as filas."""
+    def _coletar_mensagens(self) -> Tuple[List[Dict], bool]:
+        """
+        Coleta mensagens de todas as filas. Retorna as mensagens e se alguma fila entregou o
+        lote cheio (LIMITE_DRENAGEM), isto é, se ainda pode haver mensagens pendentes.
+        """
         mensagens = []
+        restam = False
         for fila in self.filas_comunicacao.values():
-            try:
-                while not fila.empty():
-                    mensagens.append(fila.get_nowait())
-            except queue.Empty:
-                continue
-        return mensagens
+            # A thread só chega aqui avisada de mensagens novas: não espera nas filas vazias
+            lote = _drenar_fila(fila, timeout=0)
+            restam = restam or len(lote) >= LIMITE_DRENAGEM
+            mensagens.extend(lote)
+        return mensagens, restam
         
     def _distribuir_conhecimento(self, mensagens: List[Dict]):
         """Distribui conhecimento entre as IAs."""
@@ -87,4 +87,6 @@ class EcossistemaProjeto:
         for no in self.nos_ia.values():
             no.parar()
             if hasattr(no, 'salvar_estado'):
-                no.salvar_estado()
\ No newline at end of file
+                no.salvar_estado()
+        # Encerra o processo servidor do grafo de conhecimento deste ecossistema
+        self.grafo_conhecimento.parar()
\ No newline at end of file
@@ -8,15 +8,21 @@ sistemas de IA. Suporta múltiplos níveis de log (incluindo níveis específico
 saída colorida no console, buffer em memória, persistência em arquivos e anexação de 
 detalhes estruturados em JSON.
 
+A escrita em console e arquivo é feita por uma thread escritora por processo: `log()` só
+formata a mensagem e a enfileira, sem bloquear o chamador (ex.: o scan de um driver) em I/O.
+
 Attributes:
     MAX_LOGS (int): Tamanho máximo do buffer circular (default=5000).
     CORES_NIVEL (dict): Mapeamento entre níveis de log e cores ANSI.
     NIVEIS_VALIDOS (set): Conjunto de níveis de log aceitos.
     LOG_DIR (str): Diretório onde os arquivos de log são gravados.
+    MAX_FILA_ESCRITA (int): Capacidade da fila da thread escritora; cheia, a escrita volta a ser síncrona.
 
 Functions:
     log(level, source, message, details=None):
         Registra um log em console, buffer e arquivo.
+    log_desativado(*args, **kwargs):
+        Logger nulo, usado no lugar de `log` quando o log de um componente está desabilitado.
     get_recent_logs(limit=None):
         Retorna os últimos N registros do buffer.
     get_logs_since(timestamp):
@@ -25,6 +31,8 @@ Functions:
 
 
 from datetime import datetime
+import atexit
+import queue
 import threading
 from collections import deque
 import json
@@ -78,6 +86,79 @@ os.makedirs(LOG_DIR, exist_ok=True)
 # Arquivo de log atual
 current_log_file = os.path.join(LOG_DIR, f"inlogic_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 
+# Fila de (mensagem_console, linha_arquivo) consumida pela thread escritora do processo
+MAX_FILA_ESCRITA = 10000
+_fila_escrita = queue.Queue(maxsize=MAX_FILA_ESCRITA)
+_escritor = None
+_escritor_pid = None
+_escritor_lock = threading.Lock()
+
+
+def _garantir_escritor():
+    """Inicia a thread escritora deste processo (também após um fork, que não herda threads)."""
+    global _escritor, _escritor_pid, _fila_escrita
+    pid = os.getpid()
+    if _escritor_pid == pid and _escritor is not None and _escritor.is_alive():
+        return
+    with _escritor_lock:
+        if _escritor_pid == pid and _escritor is not None and _escritor.is_alive():
+            return
+        if _escritor_pid != pid:
+            _fila_escrita = queue.Queue(maxsize=MAX_FILA_ESCRITA)
+        _escritor = threading.Thread(target=_laco_escritor, args=(_fila_escrita,), name="LogWriter", daemon=True)
+        _escritor_pid = pid
+        _escritor.start()
+
+
+def _escrever(mensagens, linhas, arquivo=None):
+    """Escreve um lote de mensagens no console e no arquivo de log."""
+    print("\n".join(mensagens), flush=True)
+    if arquivo is None:
+        with open(current_log_file, 'a', encoding='utf-8') as f:
+            f.writelines(linhas)
+    else:
+        arquivo.writelines(linhas)
+        arquivo.flush()
+
+
+def _laco_escritor(fila):
+    """Consome a fila em lotes, mantendo o arquivo de log aberto entre as escritas."""
+    arquivo = None
+    while True:
+        item = fila.get()
+        lote = [item]
+        while len(lote) < 500:
+            try:
+                lote.append(fila.get_nowait())
+            except queue.Empty:
+                break
+        encerrar = None in lote
+        lote = [i for i in lote if i is not None]
+        try:
+            if arquivo is None:
+                arquivo = open(current_log_file, 'a', encoding='utf-8')
+            if lote:
+                _escrever([m for m, _ in lote], [l for _, l in lote], arquivo)
+        except Exception as e:
+            print(f"{Fore.RED}Erro ao processar log: {str(e)}{Style.RESET_ALL}", flush=True)
+            arquivo = None
+        if encerrar:
+            if arquivo is not None:
+                arquivo.close()
+            return
+
+
+def _encerrar_escritor():
+    """Escreve as mensagens pendentes ao encerrar o processo."""
+    if _escritor is not None and _escritor_pid == os.getpid() and _escritor.is_alive():
+        try:
+            _fila_escrita.put(None, timeout=1)
+            _escritor.join(timeout=2)
+        except queue.Full:
+            pass
+
+atexit.register(_encerrar_escritor)
+
 def log(level: str, source: str, message: str, details: Dict[str, Any] = None):
     """
     Função de log centralizada e thread-safe para todo o sistema.
@@ -121,24 +202,36 @@ def log(level: str, source: str, message: str, details: Dict[str, Any] = None):
         except Exception as e:
             log_message += f"\n{' '*45}{Fore.RED}Erro ao formatar detalhes: {str(e)}{reset}"
     
+    linha_arquivo = f"{timestamp}|{level}|{source}|{message}"
+    if details:
+        linha_arquivo += f"|{json.dumps(details, ensure_ascii=False, default=str)}"
+    linha_arquivo += "\n"
+
     with log_lock:
-        try:
-            # Imprime no console
-            print(log_message, flush=True)  # flush=True para garantir saída imediata
-            
-            # Salva no buffer
-            log_buffer.append(log_entry)
-            
-            # Salva em arquivo
-            with open(current_log_file, 'a', encoding='utf-8') as f:
-                f.write(f"{timestamp}|{level}|{source}|{message}")
-                if details:
-                    f.write(f"|{json.dumps(details, ensure_ascii=False)}")
-                f.write("\n")
-                f.flush()  # Força escrita no arquivo
-                
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao processar log: {str(e)}{Style.RESET_ALL}", flush=True)
+        # Salva no buffer
+        log_buffer.append(log_entry)
+
+    # Console e arquivo ficam com a thread escritora
+    try:
+        _garantir_escritor()
+        _fila_escrita.put_nowait((log_message, linha_arquivo))
+    except queue.Full:
+        # Fila cheia: escreve de forma síncrona em vez de descartar a mensagem
+        with log_lock:
+            try:
+                _escrever([log_message], [linha_arquivo])
+            except Exception as e:
+                print(f"{Fore.RED}Erro ao processar log: {str(e)}{Style.RESET_ALL}", flush=True)
+
+def log_desativado(*args, **kwargs):
+    """
+    Logger nulo com a mesma assinatura de `log`.
+
+    Componentes com log desabilitado o associam uma única vez na inicialização
+    (ex.: `self._log = log if log_enabled else log_desativado`), eliminando a
+    verificação de flag em cada ponto de log do caminho quente.
+    """
+    return None
 
 def get_recent_logs(limit=None):
     """Retorna os logs mais recentes."""
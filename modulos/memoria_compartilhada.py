@@ -0,0 +1,478 @@
+# modulos.memoria_compartilhada.py
+
+"""
+Estado dos drivers em memória compartilhada.
+
+Substitui o dicionário do `multiprocessing.Manager` usado para publicar o estado
+dos drivers. Com o Manager, cada leitura/escrita é um round-trip (socket + pickle)
+até o processo servidor; aqui cada driver possui um bloco `SharedMemory` próprio,
+onde publica o snapshot completo do seu estado com uma única cópia de memória.
+
+Layout de cada bloco:
+    [seq: uint64][tamanho: uint32][formato: 1 byte][payload serializado ...]
+
+O payload é serializado com pickle (padrão) ou msgpack. Nos snapshots típicos dos drivers
+o pickle é mais rápido e menor, pois reaproveita as strings repetidas entre tags; o
+msgpack é útil quando o bloco também é lido por consumidores fora do Python. Snapshots com
+tipos que o msgpack não representa caem para pickle. O leitor identifica o formato pelo
+marcador, então só o escritor precisa conhecer o codec configurado.
+
+O contador `seq` funciona como um seqlock: o escritor o torna ímpar antes de
+copiar o payload e par ao terminar; o leitor repete a leitura se observar um
+valor ímpar ou se o contador mudar durante a cópia. Como cada bloco tem um único
+processo escritor (o driver dono), nenhuma trava entre processos é necessária.
+
+Classes:
+    SnapshotCompartilhado: Bloco de memória com o último estado publicado.
+    DadosDriversCompartilhados: Mapeamento driver_id -> estado, com a mesma
+        interface de dicionário usada pelos drivers, API e interface.
+    FilaCircularCompartilhada: Fila de escrita SPSC (um produtor, um consumidor)
+        em buffer circular, com a interface de `queue.Queue` usada pelos drivers
+        e `get_many_nowait` para drenar todos os comandos pendentes de uma vez.
+"""
+
+import multiprocessing
+import pickle
+import queue
+import struct
+import threading
+import time
+from collections.abc import MutableMapping
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, Optional
+
+# msgpack é opcional: sem ele o codec 'msgpack' também usa pickle
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Cabeçalho do bloco: contador de sequência (seqlock) + tamanho do payload
+_CABECALHO = struct.Struct('<QI')
+
+# Dimensionamento padrão dos blocos (bytes)
+TAMANHO_BASE = 64 * 1024
+TAMANHO_POR_TAG = 2 * 1024
+
+# Marcador do formato do payload (primeiro byte após o cabeçalho)
+_FORMATO_MSGPACK = b'M'
+_FORMATO_PICKLE = b'P'
+
+# Redução de snapshots que não cabem no bloco: textos são truncados e valores de tag
+# que continuem grandes demais são substituídos por None
+LIMITE_TEXTO_REDUZIDO = 512
+LIMITE_VALOR_REDUZIDO = TAMANHO_POR_TAG // 2
+_SUFIXO_TRUNCADO = '...[truncado]'
+
+# Tentativas de leitura antes de devolver o último snapshot válido
+MAX_TENTATIVAS_LEITURA = 1000
+
+# Fila circular: cabeçalho com os contadores head/tail (bytes consumidos/produzidos).
+# Cada lado grava apenas o seu contador, nos offsets abaixo.
+_CABECALHO_FILA = struct.Struct('<QQ')
+_CONTADOR = struct.Struct('<Q')
+_OFFSET_HEAD = 0
+_OFFSET_TAIL = _CONTADOR.size
+_TAMANHO_REGISTRO = struct.Struct('<I')
+_MARCA_VOLTA = 0xFFFFFFFF  # registro de preenchimento: o próximo começa no início do buffer
+TAMANHO_FILA_PADRAO = 256 * 1024
+
+
+CODECS = ('pickle', 'msgpack')
+
+
+def _serializar(dados: Dict[str, Any], codec: str = 'pickle') -> bytes:
+    """Serializa o snapshot com o marcador de formato na frente."""
+    if codec == 'msgpack' and msgpack is not None:
+        try:
+            return _FORMATO_MSGPACK + msgpack.packb(dados, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return _FORMATO_PICKLE + pickle.dumps(dados, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _desserializar(payload: bytes) -> Dict[str, Any]:
+    if payload[:1] == _FORMATO_MSGPACK:
+        return msgpack.unpackb(payload[1:], raw=False, strict_map_key=False)
+    return pickle.loads(payload[1:])
+
+
+def _truncar_texto(valor: Any) -> Any:
+    if isinstance(valor, str) and len(valor) > LIMITE_TEXTO_REDUZIDO:
+        return valor[:LIMITE_TEXTO_REDUZIDO] + _SUFIXO_TRUNCADO
+    if isinstance(valor, (bytes, bytearray)) and len(valor) > LIMITE_TEXTO_REDUZIDO:
+        return bytes(valor[:LIMITE_TEXTO_REDUZIDO])
+    return valor
+
+
+def _reduzir_snapshot(dados: Dict[str, Any], descartar_valores: bool) -> Dict[str, Any]:
+    """
+    Cópia do snapshot com os campos textuais truncados. Com `descartar_valores`, os
+    valores de tag que ainda passem de LIMITE_VALOR_REDUZIDO bytes viram None com
+    qualidade ruim, para que o status e as demais tags continuem sendo publicados.
+    """
+    reduzido = {chave: _truncar_texto(valor) for chave, valor in dados.items()}
+    tags = dados.get('tags')
+    if isinstance(tags, dict):
+        tags_reduzidas = {}
+        for tag_id, tag in tags.items():
+            if isinstance(tag, dict):
+                tag = {chave: _truncar_texto(valor) for chave, valor in tag.items()}
+                if descartar_valores and tag.get('valor') is not None and \
+                        len(pickle.dumps(tag['valor'], protocol=pickle.HIGHEST_PROTOCOL)) > LIMITE_VALOR_REDUZIDO:
+                    tag.update(valor=None, qualidade='ruim', log='Valor excede o bloco de memória compartilhada')
+            tags_reduzidas[tag_id] = tag
+        reduzido['tags'] = tags_reduzidas
+    return reduzido
+
+
+def tamanho_para_tags(quantidade_tags: int) -> int:
+    """Calcula o tamanho de bloco recomendado para um driver com N tags."""
+    return TAMANHO_BASE + max(0, quantidade_tags) * TAMANHO_POR_TAG
+
+
+class SnapshotCompartilhado:
+    """
+    Bloco de memória compartilhada contendo o último snapshot (dict) publicado.
+
+    O bloco é criado no processo principal e anexado sob demanda nos processos
+    filhos: ao ser serializado para um `Process`, apenas o nome e o tamanho do
+    bloco são transmitidos.
+    """
+
+    def __init__(self, tamanho: int = TAMANHO_BASE, nome: Optional[str] = None, codec: str = 'pickle'):
+        """
+        Cria (ou anexa) um bloco de memória compartilhada.
+
+        Args:
+            tamanho: Capacidade total do bloco em bytes, incluindo o cabeçalho.
+            nome: Nome de um bloco existente para anexar. Se None, cria um novo.
+            codec: Serialização usada em `publicar` ('pickle' ou 'msgpack').
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Codec '{codec}' inválido. Use um de {CODECS}.")
+        self.codec = codec
+        if nome is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=tamanho)
+            _CABECALHO.pack_into(self._shm.buf, 0, 0, 0)
+            self._dono = True
+        else:
+            self._shm = None
+            self._dono = False
+        self.nome = nome or self._shm.name
+        self.tamanho = tamanho
+        self._lock_escrita = threading.Lock()
+        self._ultimo_lido: Dict[str, Any] = {}
+
+    def __getstate__(self):
+        return {'nome': self.nome, 'tamanho': self.tamanho, 'codec': self.codec}
+
+    def __setstate__(self, estado):
+        self.__init__(tamanho=estado['tamanho'], nome=estado['nome'], codec=estado['codec'])
+
+    @property
+    def _buf(self) -> memoryview:
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(name=self.nome)
+        return self._shm.buf
+
+    @property
+    def capacidade(self) -> int:
+        """Bytes disponíveis para o payload."""
+        return self.tamanho - _CABECALHO.size
+
+    def publicar(self, dados: Dict[str, Any]):
+        """
+        Publica um novo snapshot no bloco.
+
+        Se o snapshot não couber, publica uma versão reduzida (textos truncados e,
+        se ainda necessário, valores de tag grandes descartados), de modo que um
+        valor grande não congele o estado do driver.
+
+        Raises:
+            ValueError: Se nem o snapshot reduzido couber no bloco.
+        """
+        payload = _serializar(dados, self.codec)
+        for descartar_valores in (False, True):
+            if len(payload) <= self.capacidade:
+                break
+            payload = _serializar(_reduzir_snapshot(dados, descartar_valores), self.codec)
+        tamanho = len(payload)
+        if tamanho > self.capacidade:
+            raise ValueError(
+                f"Snapshot de {tamanho} bytes excede a capacidade do bloco '{self.nome}' ({self.capacidade} bytes).")
+
+        with self._lock_escrita:
+            buf = self._buf
+            seq, tamanho_anterior = _CABECALHO.unpack_from(buf, 0)
+            # seq ímpar: escrita em andamento
+            _CABECALHO.pack_into(buf, 0, seq + 1, tamanho_anterior)
+            buf[_CABECALHO.size:_CABECALHO.size + tamanho] = payload
+            _CABECALHO.pack_into(buf, 0, seq + 2, tamanho)
+
+    def ler(self) -> Dict[str, Any]:
+        """Retorna uma cópia do último snapshot publicado ({} se nunca publicado)."""
+        buf = self._buf
+        for tentativa in range(MAX_TENTATIVAS_LEITURA):
+            seq, tamanho = _CABECALHO.unpack_from(buf, 0)
+            if seq & 1:
+                time.sleep(0 if tentativa < 10 else 0.001)
+                continue
+            payload = bytes(buf[_CABECALHO.size:_CABECALHO.size + tamanho])
+            if _CABECALHO.unpack_from(buf, 0)[0] != seq:
+                continue
+            self._ultimo_lido = _desserializar(payload) if tamanho else {}
+            return self._ultimo_lido
+        # Escritor preso no meio de uma publicação (ex.: processo encerrado): devolve o último válido
+        return dict(self._ultimo_lido)
+
+    def fechar(self):
+        """Desanexa o bloco deste processo e, se for o criador, o remove do sistema."""
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+            if self._dono:
+                self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        finally:
+            self._shm = None
+
+
+class DadosDriversCompartilhados(MutableMapping):
+    """
+    Mapeamento driver_id -> estado do driver, apoiado em um `SnapshotCompartilhado`
+    por driver.
+
+    Mantém a interface de dicionário do antigo `manager.dict()`: os drivers fazem
+    `shared_data.get(driver_id)` / `shared_data[driver_id] = dados`, e os
+    consumidores (API, painel, IA) iteram normalmente. Cada leitura devolve uma
+    cópia local; alterações só são visíveis após uma nova atribuição.
+    """
+
+    def __init__(self, codec: str = 'pickle'):
+        self.codec = codec
+        self._blocos: Dict[str, SnapshotCompartilhado] = {}
+
+    def criar(self, driver_id: str, dados_iniciais: Dict[str, Any], tamanho: int = TAMANHO_BASE):
+        """Aloca o bloco de um driver e publica seu estado inicial. Deve ser chamado antes de iniciar o processo."""
+        if driver_id in self._blocos:
+            self._blocos[driver_id].fechar()
+        bloco = SnapshotCompartilhado(tamanho=tamanho, codec=self.codec)
+        bloco.publicar(dados_iniciais)
+        self._blocos[driver_id] = bloco
+
+    def __getitem__(self, driver_id: str) -> Dict[str, Any]:
+        return self._blocos[driver_id].ler()
+
+    def __setitem__(self, driver_id: str, dados: Dict[str, Any]):
+        if driver_id not in self._blocos:
+            self.criar(driver_id, dados)
+        else:
+            self._blocos[driver_id].publicar(dados)
+
+    def __delitem__(self, driver_id: str):
+        self._blocos.pop(driver_id).fechar()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._blocos))
+
+    def __len__(self) -> int:
+        return len(self._blocos)
+
+    def __contains__(self, driver_id) -> bool:
+        return driver_id in self._blocos
+
+
+class FilaCircularCompartilhada:
+    """
+    Fila de comandos de escrita em memória compartilhada (buffer circular SPSC).
+
+    O processo principal é o único produtor (as threads dele serializam o `put`
+    com uma trava local) e o processo do driver é o único consumidor. Cada lado
+    só escreve o seu próprio contador (tail para o produtor, head para o
+    consumidor), portanto não há trava entre processos no caminho quente.
+
+    Registros: [tamanho: uint32][payload serializado]. Quando um registro não cabe
+    no final do buffer, é gravada uma marca de volta e ele começa no início.
+
+    Cada `put` sinaliza um `multiprocessing.Event`, permitindo ao consumidor
+    dormir em `aguardar_item` e acordar assim que um comando chega.
+    """
+
+    def __init__(self, tamanho: int = TAMANHO_FILA_PADRAO, nome: Optional[str] = None, evento=None):
+        """
+        Cria (ou anexa) a fila.
+
+        Args:
+            tamanho: Capacidade do buffer de dados em bytes.
+            nome: Nome de um bloco existente para anexar. Se None, cria um novo.
+            evento: Evento de sinalização de um bloco existente (ao anexar).
+        """
+        if nome is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=_CABECALHO_FILA.size + tamanho)
+            _CABECALHO_FILA.pack_into(self._shm.buf, 0, 0, 0)
+            self._dono = True
+        else:
+            self._shm = None
+            self._dono = False
+        self.nome = nome or self._shm.name
+        self.tamanho = tamanho
+        self._lock_produtor = threading.Lock()
+        self._evento = evento if evento is not None else multiprocessing.Event()
+
+    def __getstate__(self):
+        # O Event só pode ser transmitido na criação do processo filho (herança)
+        return {'nome': self.nome, 'tamanho': self.tamanho, 'evento': self._evento}
+
+    def __setstate__(self, estado):
+        self.__init__(tamanho=estado['tamanho'], nome=estado['nome'], evento=estado['evento'])
+
+    @property
+    def _buf(self) -> memoryview:
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(name=self.nome)
+        return self._shm.buf
+
+    def _contadores(self):
+        return _CABECALHO_FILA.unpack_from(self._buf, 0)
+
+    def qsize(self) -> int:
+        """Bytes pendentes na fila (aproximado, como em `queue.Queue`)."""
+        head, tail = self._contadores()
+        return tail - head
+
+    def empty(self) -> bool:
+        head, tail = self._contadores()
+        return head == tail
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None):
+        """
+        Enfileira um item.
+
+        Raises:
+            ValueError: Se o item serializado for maior que o buffer.
+            queue.Full: Se não houver espaço (block=False ou timeout esgotado).
+        """
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        tamanho_registro = _TAMANHO_REGISTRO.size + len(payload)
+        if tamanho_registro > self.tamanho:
+            raise ValueError(f"Item de {len(payload)} bytes excede a capacidade da fila '{self.nome}'.")
+
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._lock_produtor:
+            buf = self._buf
+            base = _CABECALHO_FILA.size
+            while True:
+                head, tail = self._contadores()
+                pos = tail % self.tamanho
+                contiguo = self.tamanho - pos
+                necessario = tamanho_registro + (contiguo if contiguo < tamanho_registro else 0)
+                if necessario <= self.tamanho - (tail - head):
+                    break
+                if not block or (limite is not None and time.monotonic() >= limite):
+                    raise queue.Full
+                time.sleep(0.001)
+
+            if contiguo < tamanho_registro:
+                if contiguo >= _TAMANHO_REGISTRO.size:
+                    _TAMANHO_REGISTRO.pack_into(buf, base + pos, _MARCA_VOLTA)
+                tail += contiguo
+                pos = 0
+            _TAMANHO_REGISTRO.pack_into(buf, base + pos, len(payload))
+            inicio = base + pos + _TAMANHO_REGISTRO.size
+            buf[inicio:inicio + len(payload)] = payload
+            # Publica o registro somente depois de copiado
+            _CONTADOR.pack_into(buf, _OFFSET_TAIL, tail + tamanho_registro)
+        self._evento.set()
+
+    def put_nowait(self, item: Any):
+        self.put(item, block=False)
+
+    def get_nowait(self) -> Any:
+        """
+        Remove e retorna o próximo item.
+
+        Raises:
+            queue.Empty: Se a fila estiver vazia.
+        """
+        buf = self._buf
+        base = _CABECALHO_FILA.size
+        head, tail = self._contadores()
+        if head == tail:
+            raise queue.Empty
+        pos = head % self.tamanho
+        contiguo = self.tamanho - pos
+        if contiguo < _TAMANHO_REGISTRO.size or _TAMANHO_REGISTRO.unpack_from(buf, base + pos)[0] == _MARCA_VOLTA:
+            head += contiguo
+            pos = 0
+        tamanho = _TAMANHO_REGISTRO.unpack_from(buf, base + pos)[0]
+        inicio = base + pos + _TAMANHO_REGISTRO.size
+        item = pickle.loads(bytes(buf[inicio:inicio + tamanho]))
+        _CONTADOR.pack_into(buf, _OFFSET_HEAD, head + _TAMANHO_REGISTRO.size + tamanho)
+        return item
+
+    def get_many_nowait(self, max_itens: Optional[int] = None) -> list:
+        """
+        Remove e retorna de uma vez todos os itens pendentes (até `max_itens`).
+
+        Lê o contador do produtor uma única vez e atualiza o do consumidor uma única vez
+        ao final, em vez de um par de acessos por item como em `get_nowait`.
+
+        Returns:
+            list: Itens na ordem de chegada (vazia se a fila estiver vazia).
+        """
+        buf = self._buf
+        base = _CABECALHO_FILA.size
+        head, tail = self._contadores()
+        itens = []
+        while head != tail and (max_itens is None or len(itens) < max_itens):
+            pos = head % self.tamanho
+            contiguo = self.tamanho - pos
+            if contiguo < _TAMANHO_REGISTRO.size or _TAMANHO_REGISTRO.unpack_from(buf, base + pos)[0] == _MARCA_VOLTA:
+                head += contiguo
+                pos = 0
+            tamanho = _TAMANHO_REGISTRO.unpack_from(buf, base + pos)[0]
+            inicio = base + pos + _TAMANHO_REGISTRO.size
+            itens.append(pickle.loads(bytes(buf[inicio:inicio + tamanho])))
+            head += _TAMANHO_REGISTRO.size + tamanho
+        if itens:
+            _CONTADOR.pack_into(buf, _OFFSET_HEAD, head)
+        return itens
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Remove e retorna o próximo item, aguardando até `timeout` segundos se necessário."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                if not block or (limite is not None and time.monotonic() >= limite):
+                    raise
+                time.sleep(0.001)
+
+    def aguardar_item(self, timeout: Optional[float] = None) -> bool:
+        """
+        Bloqueia até que um item seja enfileirado ou o timeout expire.
+
+        Returns:
+            bool: True se há itens pendentes.
+        """
+        if self._evento.wait(timeout):
+            # Limpa antes do consumo: um put posterior volta a sinalizar
+            self._evento.clear()
+        return not self.empty()
+
+    def fechar(self):
+        """Desanexa a fila deste processo e, se for o criador, a remove do sistema."""
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+            if self._dono:
+                self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        finally:
+            self._shm = None
@@ -17,12 +17,15 @@ Funcionalidades principais:
 
 
 import json
+import queue
 import time
 import sys
 import psutil
 import multiprocessing
 from multiprocessing import freeze_support
+import multiprocessing.spawn
 import os
+import shutil
 import threading
 
 
@@ -52,6 +55,7 @@ except ImportError:
 
 # Importação do sistema de logging personalizado
 from modulos.logger import log
+from modulos.memoria_compartilhada import DadosDriversCompartilhados, FilaCircularCompartilhada, tamanho_para_tags
 
 class MockDriverProcess(multiprocessing.Process):
     """
@@ -109,6 +113,10 @@ def descriptografar_json(conteudo_criptografado):
 
 CONFIG_FILE = r'C:\In Logic\Setup ativos\Setup.cfg'
 
+# Espera máxima por espaço na fila de escrita de um driver (s). Se o driver parou ou travou, a
+# fila enche e o comando é descartado em vez de bloquear a thread da API/IA que escreve.
+TIMEOUT_FILA_ESCRITA = 0.5
+
 class SistemaPrincipal:
 
     """
@@ -145,8 +153,9 @@ class SistemaPrincipal:
         self.config = self._carregar_configuracao()
         
         # Estruturas compartilhadas entre processos
-        self.shared_driver_data = self.manager.dict()  # Dados dos drivers
-        self.write_queues = self.manager.dict()        # Filas de escrita
+        # Dados dos drivers (memória compartilhada); 'shared_data_codec' escolhe pickle (padrão) ou msgpack
+        self.shared_driver_data = DadosDriversCompartilhados(codec=self.config.get('shared_data_codec', 'pickle'))
+        self.write_queues = {}                          # Filas de escrita (buffer circular em memória compartilhada)
         self.driver_processes = []                      # Lista de processos
         
         # Mapa de tags -> drivers (compartilhado)
@@ -223,6 +232,14 @@ class SistemaPrincipal:
             log('WARN', self.source_name, "Nenhum projeto encontrado na configuração.")
             return
 
+        # Drivers executados juntos em um único processo por tipo
+        # (opções 'modbus_single_process' e 'mqtt_single_process')
+        agrupar = {
+            'modbus': self.config.get('modbus_single_process', False),
+            'mqtt': self.config.get('mqtt_single_process', False),
+        }
+        drivers_agrupados = {'modbus': [], 'mqtt': []}
+
         for projeto in self.config['projetos']:
             for driver_config in projeto.get('drivers', []):
                 driver_id = driver_config['id']
@@ -232,24 +249,30 @@ class SistemaPrincipal:
 
                 # **CORREÇÃO CRUCIAL**
                 # Crie a fila e o sub-dicionário ANTES de iniciar o processo
-                write_queue = self.manager.Queue()
+                write_queue = FilaCircularCompartilhada()
                 self.write_queues[driver_id] = write_queue
                 
-                # Prepara o estado inicial do driver com informações de fase
-                self.shared_driver_data[driver_id] = self.manager.dict({
+                # Prepara o estado inicial do driver com informações de fase.
+                # Cada driver recebe um bloco de memória compartilhada próprio, dimensionado pelas suas tags.
+                self.shared_driver_data.criar(driver_id, {
                     "status_conexao": "iniciando",
                     "detalhe": "Processo sendo criado.",
                     "config": driver_config,
-                    "tags": self.manager.dict(),
+                    "tags": {},
                     "fase_atual": driver_config.get('fase_operacao', 'MONITORAMENTO'),
                     "modo_operacao": driver_config.get('modo_operacao', 'normal'),
                     "restricoes": driver_config.get('restricoes', {}),
                     "ultima_atualizacao": time.strftime("%Y-%m-%d %H:%M:%S")
-                })
+                }, tamanho=tamanho_para_tags(len(tags_para_este_driver)))
 
                 tipo_driver = driver_config.get('tipo', '').lower()
                 ProcessoClasse = None
 
+                grupo = 'modbus' if tipo_driver in ['modbus_tcp', 'modbus'] else tipo_driver
+                if agrupar.get(grupo):
+                    drivers_agrupados[grupo].append((driver_config, tags_para_este_driver, write_queue))
+                    continue
+
                 try:
 
                     # Verifica tipo de driver Controllogix
@@ -257,7 +280,7 @@ class SistemaPrincipal:
                         from driver.controllogix_driver_process import controllogixDriverProcess as ProcessoClasse
                     # Verifica tipo de driver Modbus
                     elif tipo_driver in ['modbus_tcp', 'modbus']:
-                        from driver.mqtt_driver_process import ModbusDriverProcess as ProcessoClasse
+                        from driver.modbus_driver_process import ModbusDriverProcess as ProcessoClasse
                     # Verifica tipo de driver MQTT
                     elif tipo_driver == 'mqtt':
                         from driver.mqtt_driver_process import MQTTDriverProcess as ProcessoClasse
@@ -280,7 +303,66 @@ class SistemaPrincipal:
                     write_queue=write_queue # Passa a fila específica
                 )
                 self.driver_processes.append(processo)
+                self._iniciar_processo_driver(processo, driver_config)
+
+        for grupo, drivers in drivers_agrupados.items():
+            if drivers:
+                self._iniciar_grupo_drivers(grupo, drivers)
+
+    def _iniciar_grupo_drivers(self, grupo, drivers):
+        """Inicia os drivers de um mesmo tipo ('modbus' ou 'mqtt') em um único processo, um thread por driver."""
+        nome = {'modbus': 'Modbus', 'mqtt': 'MQTT'}[grupo]
+        try:
+            if grupo == 'modbus':
+                from driver.modbus_driver_process import ModbusDriverGroupProcess as GrupoClasse
+            else:
+                from driver.mqtt_driver_process import MQTTDriverGroupProcess as GrupoClasse
+        except ImportError:
+            log('WARN', self.source_name, f"Não foi possível importar o driver {nome}. Usando Mock para os drivers agrupados.")
+            for driver_config, tags_para_este_driver, write_queue in drivers:
+                processo = MockDriverProcess(driver_config=driver_config, tags_config=tags_para_este_driver,
+                                             shared_data=self.shared_driver_data, write_queue=write_queue)
+                self.driver_processes.append(processo)
                 processo.start()
+            return
+        processo = GrupoClasse(drivers=drivers, shared_data=self.shared_driver_data)
+        self.driver_processes.append(processo)
+        processo.start()
+        log('INFO', self.source_name, f"{len(drivers)} drivers {nome} iniciados em um único processo.")
+
+    def _iniciar_processo_driver(self, processo, driver_config):
+        """
+        Inicia o processo do driver, opcionalmente sob outro interpretador.
+
+        Se `config.python_executable` estiver definido (ex.: caminho do pypy3), o processo é
+        criado com esse executável. Os drivers são laços de dicionários e atributos em Python
+        puro (pycomm3, pyModbusTCP), que o JIT do PyPy acelera em execuções longas.
+        Só vale para o método de início 'spawn' (padrão no Windows); com 'fork' o processo
+        herda o interpretador atual.
+        """
+        executavel = driver_config.get('config', {}).get('python_executable')
+        if not executavel:
+            processo.start()
+            return
+
+        caminho = shutil.which(executavel)
+        if not caminho:
+            log('WARN', self.source_name, f"Interpretador '{executavel}' do driver '{driver_config['id']}' não encontrado. Usando o interpretador atual.")
+            processo.start()
+            return
+        if multiprocessing.get_start_method() != 'spawn':
+            log('WARN', self.source_name, f"'python_executable' ignorado para o driver '{driver_config['id']}': requer o método de início 'spawn'.")
+            processo.start()
+            return
+
+        # O executável do spawn é global: troca apenas durante a criação deste processo
+        executavel_original = multiprocessing.spawn.get_executable()
+        multiprocessing.spawn.set_executable(caminho)
+        try:
+            processo.start()
+        finally:
+            multiprocessing.spawn.set_executable(executavel_original)
+        log('INFO', self.source_name, f"Driver '{driver_config['id']}' iniciado com o interpretador '{caminho}'.")
 
 
     def _exibir_status_periodicamente(self):
@@ -476,6 +558,12 @@ class SistemaPrincipal:
         self.driver_processes = [] # Limpa a lista de processos
         log('INFO', self.source_name, "Todos os processos de driver foram encerrados.")
 
+    def _liberar_filas_escrita(self):
+        """Libera os buffers de memória compartilhada das filas de escrita dos drivers."""
+        for fila in self.write_queues.values():
+            fila.fechar()
+        self.write_queues.clear()
+
     # --- 2. O MÉTODO 'parar_servidor_api' também continua o mesmo ---
     def parar_servidor_api(self):
         """Para o servidor da API de forma limpa."""
@@ -498,8 +586,10 @@ class SistemaPrincipal:
         # 1. Para a API primeiro para não aceitar novas requisições
         self.parar_servidor_api()
         
-        # 2. Para os drivers que estão coletando dados
+        # 2. Para os drivers que estão coletando dados e libera seus blocos de memória compartilhada
         self.parar_drivers()
+        self.shared_driver_data.clear()
+        self._liberar_filas_escrita()
 
         # 3. Para o sistema de IA e salva seu estado final
         if self.ia_manager and hasattr(self.ia_manager, 'parar'):
@@ -535,7 +625,7 @@ class SistemaPrincipal:
         # O Manager do multiprocessing não permite limpar os dicts facilmente,
         # por isso a melhor prática é recriar o IAManager
         self.shared_driver_data.clear()
-        self.write_queues.clear()
+        self._liberar_filas_escrita()
         self.tag_map.clear()
         self.last_processed_data.clear()
 
@@ -584,13 +674,13 @@ class SistemaPrincipal:
 
         if not driver_id:
             log('ERROR', self.source_name, f"Tag com ID '{tag_id}' não encontrada em nenhum driver.")
-            return
+            return False
 
         # 2. Valida a operação com o gerenciador de IA
         validacao = self.ia_manager.validar_escrita(tag_id, valor)
         if not validacao['permitido']:
             log('ERROR', self.source_name, f"Escrita não permitida para tag '{tag_id}': {validacao['erro']}")
-            return
+            return False
 
         # 3. Verifica se a fila de escrita para esse driver existe
         if driver_id in self.write_queues:
@@ -598,12 +688,15 @@ class SistemaPrincipal:
             comando = (tag_id, valor)
             
             # 4. Envia o comando para a fila correta
-            fila_do_driver.put(comando)
+            if not self._enfileirar_escrita(driver_id, fila_do_driver, comando, f"Tag '{tag_id}', Valor: '{valor}'"):
+                return False
             log('INFO', self.source_name, 
                 f"Comando de escrita enviado para Tag '{tag_id}' (Driver: {driver_id}), " +
                 f"Valor: '{valor}', Fase: {validacao['fase_atual']}")
+            return True
         else:
             log('ERROR', self.source_name, f"Fila de escrita não encontrada para o driver '{driver_id}'")
+            return False
 
 
 
@@ -618,10 +711,28 @@ class SistemaPrincipal:
         fila_do_driver = self.write_queues[driver_id]
         item = {"valores": valores}  # Envia dict para escrita em lote
 
-        fila_do_driver.put(item)
+        if not self._enfileirar_escrita(driver_id, fila_do_driver, item, "escrita em lote"):
+            return False
         log('INFO', self.source_name, f"Comando de escrita em lote enviado para o driver '{driver_id}'")
         return True
 
+    def _enfileirar_escrita(self, driver_id: str, fila, item, descricao: str) -> bool:
+        """
+        Coloca um comando na fila de escrita do driver sem bloquear indefinidamente.
+        Retorna False (com log) se a fila continuar cheia após TIMEOUT_FILA_ESCRITA ou se o
+        comando não couber na fila.
+        """
+        try:
+            fila.put(item, timeout=TIMEOUT_FILA_ESCRITA)
+            return True
+        except queue.Full:
+            log('ERROR', self.source_name,
+                f"Fila de escrita do driver '{driver_id}' cheia (driver parado ou lento). Comando descartado: {descricao}")
+        except ValueError as e:
+            log('ERROR', self.source_name,
+                f"Comando de escrita para o driver '{driver_id}' descartado: {e} ({descricao})")
+        return False
+
 
     def iniciar_servidor_api(self):
         """Cria e inicia o servidor da API em uma thread separada."""